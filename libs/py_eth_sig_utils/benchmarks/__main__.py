@@ -0,0 +1,194 @@
+""" EIP-712 encoding, hashing and signing benchmarks
+
+    python -m libs.py_eth_sig_utils.benchmarks --output results.json
+    python -m libs.py_eth_sig_utils.benchmarks --compare previous.json
+    python -m libs.py_eth_sig_utils.benchmarks --filter import --import opium_api.connector
+
+Results are written as JSON so runs can be compared between releases.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from contextlib import contextmanager
+
+from .. import utils
+from ..eip712 import encoding
+from ..signing import Signer, available_backend, recover_typed_data, recover_typed_data_batch, signature_to_v_r_s, v_r_s_to_signature, BACKEND_COINCURVE, BACKEND_PY_ECC
+from .fixtures import MAIL, MAIL_SIGNATURE, opium_order
+
+PRIVATE_KEY = utils.sha3('cow')
+BATCH_SIZE = 100
+PACKAGE = __package__.rpartition(".")[0]
+IMPORT_MODULES = (PACKAGE + ".utils", PACKAGE + ".signing")
+# Directory that makes PACKAGE importable in a fresh interpreter
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), *[os.pardir] * (PACKAGE.count(".") + 2)))
+IMPORT_SCRIPT = "import time; start = time.perf_counter(); import %s; print(time.perf_counter() - start)"
+
+@contextmanager
+def backend(name):
+    """ Temporarily force the ECDSA backend used by utils and Signer """
+    coincurve = utils.coincurve
+    if name == BACKEND_PY_ECC:
+        utils.coincurve = None
+    try:
+        yield
+    finally:
+        utils.coincurve = coincurve
+
+def available_backends():
+    backends = [BACKEND_PY_ECC]
+    if available_backend() == BACKEND_COINCURVE:
+        backends.insert(0, BACKEND_COINCURVE)
+    return backends
+
+def measure(fn, min_time, repeat):
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    # autorange targets 0.2s, scale to min_time
+    number = max(1, int(number * min_time / 0.2))
+    runs = [ elapsed / number for elapsed in timer.repeat(repeat=repeat, number=number) ]
+    return number, runs
+
+def benchmarks():
+    """ (name, backend, items per call, setup) where setup returns the callable to time """
+    mail_signature = signature_to_v_r_s(bytes.fromhex(MAIL_SIGNATURE))
+    order = opium_order()
+    orders = [ opium_order(i) for i in range(BATCH_SIZE) ]
+    payload_1k = bytes(range(256)) * 4
+
+    yield "keccak_32b", None, 1, lambda: (lambda: utils.sha3(PRIVATE_KEY))
+    yield "keccak_1kib", None, 1, lambda: (lambda: utils.sha3(payload_1k))
+    yield "schema_hash_uncached", None, 1, lambda: (lambda: encoding._create_schema_hash_cached.__wrapped__("Order", encoding.types_fingerprint(order["types"])))
+    yield "schema_hash_cached", None, 1, lambda: (lambda: encoding.create_schema_hash("Order", order["types"]))
+    yield "struct_hash_order", None, 1, lambda: (lambda: encoding.create_struct_hash("Order", order["message"], order["types"]))
+    yield "struct_hash_order_encode_data", None, 1, lambda: (lambda: utils.sha3(encoding.encode_data("Order", order["message"], order["types"])))
+    yield "encode_typed_data_mail", None, 1, lambda: (lambda: encoding.encode_typed_data(MAIL))
+    yield "encode_typed_data_order", None, 1, lambda: (lambda: encoding.encode_typed_data(order))
+    yield "checksum_encode", None, 1, lambda: (lambda: utils.checksum_encode(order["message"]["makerAddress"]))
+
+    for name in available_backends():
+        def sign_order():
+            signer = Signer(PRIVATE_KEY)
+            return lambda: signer.sign_typed_data(order)
+
+        def sign_batch():
+            signer = Signer(PRIVATE_KEY)
+            return lambda: [ signer.sign_typed_data(o) for o in orders ]
+
+        def recover_mail():
+            return lambda: recover_typed_data(MAIL, *mail_signature)
+
+        def recover_batch():
+            signer = Signer(PRIVATE_KEY)
+            items = [ (o, v_r_s_to_signature(*signer.sign_typed_data(o))) for o in orders ]
+            return lambda: recover_typed_data_batch(items)
+
+        yield "ecsign", name, 1, lambda: (lambda: utils.ecsign(PRIVATE_KEY, PRIVATE_KEY))
+        yield "sign_order", name, 1, sign_order
+        yield "sign_order_batch", name, BATCH_SIZE, sign_batch
+        yield "recover_mail", name, 1, recover_mail
+        yield "recover_order_batch", name, BATCH_SIZE, recover_batch
+
+def measure_import(module, repeat):
+    """ Cold import time of module, each run in a fresh interpreter """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT] + [p for p in [os.environ.get("PYTHONPATH")] if p]))
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT % module],
+                                env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        runs.append(float(output))
+    return runs
+
+def metadata():
+    versions = {}
+    for module in ("eth_abi", "eth_utils", "coincurve", "py_ecc", "Crypto"):
+        try:
+            versions[module] = getattr(__import__(module), "__version__", "unknown")
+        except ImportError:
+            versions[module] = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "backends": available_backends(),
+        "versions": versions,
+    }
+
+def run(selected=None, min_time=0.2, repeat=5, imports=()):
+    results = []
+    for module in IMPORT_MODULES + tuple(imports):
+        key = "import[" + module + "]"
+        if selected and not any(pattern in key for pattern in selected):
+            continue
+        runs = measure_import(module, repeat)
+        best = min(runs)
+        results.append({
+            "name": key,
+            "backend": None,
+            "items": 1,
+            "number": 1,
+            "repeat": repeat,
+            "seconds_per_call": { "min": best, "median": statistics.median(runs) },
+            "items_per_second": 1 / best,
+        })
+        print("%-36s %14.1f ms" % (key, best * 1000), file=sys.stderr)
+    for name, backend_name, items, setup in benchmarks():
+        key = name if backend_name is None else name + "[" + backend_name + "]"
+        if selected and not any(pattern in key for pattern in selected):
+            continue
+        with backend(backend_name):
+            fn = setup()
+            number, runs = measure(fn, min_time, repeat)
+        best = min(runs)
+        results.append({
+            "name": key,
+            "backend": backend_name,
+            "items": items,
+            "number": number,
+            "repeat": repeat,
+            "seconds_per_call": { "min": best, "median": statistics.median(runs) },
+            "items_per_second": items / best,
+        })
+        print("%-36s %14.1f items/s" % (key, items / best), file=sys.stderr)
+    return { "meta": metadata(), "results": results }
+
+def compare(current, previous):
+    previous = { result["name"]: result for result in previous["results"] }
+    for result in current["results"]:
+        old = previous.get(result["name"])
+        if old:
+            ratio = result["items_per_second"] / old["items_per_second"]
+            print("%-36s %7.2fx" % (result["name"], ratio), file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="py_eth_sig_utils benchmarks")
+    parser.add_argument("--output", help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--filter", action="append", help="only run benchmarks whose name contains this")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing run")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--import", dest="imports", action="append", default=[],
+                        help="also measure the cold import time of this module")
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.min_time, args.repeat, args.imports)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+
+if __name__ == '__main__':
+    main()
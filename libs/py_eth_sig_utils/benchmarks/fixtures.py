@@ -0,0 +1,109 @@
+import copy
+
+MAIL = {
+    "types": {
+        "EIP712Domain": [
+            { "name": 'name', "type": 'string' },
+            { "name": 'version', "type": 'string' },
+            { "name": 'chainId', "type": 'uint256' },
+            { "name": 'verifyingContract', "type": 'address' },
+        ],
+        "Person": [
+            { "name": 'name', "type": 'string' },
+            { "name": 'wallet', "type": 'address' }
+        ],
+        "Mail": [
+            { "name": 'from', "type": 'Person' },
+            { "name": 'to', "type": 'Person' },
+            { "name": 'contents', "type": 'string' }
+        ]
+    },
+    "primaryType": 'Mail',
+    "domain": {
+        "name": 'Ether Mail',
+        "version": '1',
+        "chainId": 1,
+        "verifyingContract": '0xCcCCccccCCCCcCCCCCCcCcCccCcCCCcCcccccccC',
+    },
+    "message": {
+        "from": {
+            "name": 'Cow',
+            "wallet": '0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826',
+        },
+        "to": {
+            "name": 'Bob',
+            "wallet": '0xbBbBBBBbbBBBbbbBbbBbbbbBBbBbbbbBbBbbBBbB',
+        },
+        "contents": 'Hello, Bob!',
+    },
+}
+
+MAIL_SIGNATURE = '4355c47d63924e8a72e509b65029052eb6c299d53a04e167c5775fd466751c9d07299936d304c153f6443dfa05f40ff007d72911b6f72307f996231605b915621c'
+
+# orderToSign as returned by POST /orderbook/formOrder, uint256 values as strings
+OPIUM_ORDER = {
+    "types": {
+        "EIP712Domain": [
+            { "name": 'name', "type": 'string' },
+            { "name": 'version', "type": 'string' },
+            { "name": 'chainId', "type": 'uint256' },
+            { "name": 'verifyingContract', "type": 'address' },
+        ],
+        "Order": [
+            { "name": 'makerMarginAddress', "type": 'address' },
+            { "name": 'takerMarginAddress', "type": 'address' },
+            { "name": 'makerAddress', "type": 'address' },
+            { "name": 'takerAddress', "type": 'address' },
+            { "name": 'senderAddress', "type": 'address' },
+            { "name": 'relayerAddress', "type": 'address' },
+            { "name": 'affiliateAddress', "type": 'address' },
+            { "name": 'feeTokenAddress', "type": 'address' },
+            { "name": 'makerTokenId', "type": 'uint256' },
+            { "name": 'makerTokenAmount', "type": 'uint256' },
+            { "name": 'makerMarginAmount', "type": 'uint256' },
+            { "name": 'takerTokenId', "type": 'uint256' },
+            { "name": 'takerTokenAmount', "type": 'uint256' },
+            { "name": 'takerMarginAmount', "type": 'uint256' },
+            { "name": 'relayerFee', "type": 'uint256' },
+            { "name": 'affiliateFee', "type": 'uint256' },
+            { "name": 'nonce', "type": 'uint256' },
+            { "name": 'expiresAt', "type": 'uint256' },
+        ]
+    },
+    "primaryType": 'Order',
+    "domain": {
+        "name": 'Opium Network',
+        "version": '1',
+        "chainId": 42,
+        "verifyingContract": '0x4C8e6A5c7C9aA3D5A0e8AE1C5b22DC4B03af4a7a',
+    },
+    "message": {
+        "makerMarginAddress": '0x0000000000000000000000000000000000000000',
+        "takerMarginAddress": '0x0000000000000000000000000000000000000000',
+        "makerAddress": '0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826',
+        "takerAddress": '0x0000000000000000000000000000000000000000',
+        "senderAddress": '0x0000000000000000000000000000000000000000',
+        "relayerAddress": '0x0000000000000000000000000000000000000000',
+        "affiliateAddress": '0x0000000000000000000000000000000000000000',
+        "feeTokenAddress": '0x0000000000000000000000000000000000000000',
+        "makerTokenId": '81290913431932358962617498384342373566151542098779622385085722364318931372817',
+        "makerTokenAmount": '1',
+        "makerMarginAmount": '0',
+        "takerTokenId": '0',
+        "takerTokenAmount": '0',
+        "takerMarginAmount": '1500000000000000000',
+        "relayerFee": '0',
+        "affiliateFee": '0',
+        "nonce": '1597237518',
+        "expiresAt": '1599829518',
+    },
+}
+
+def opium_order(nonce=0):
+    """ Opium orderToSign with uint256 strings coerced to int, as Connector signs it """
+    order = copy.deepcopy(OPIUM_ORDER)
+    uint256 = { schemaType['name'] for schemaType in order["types"]["Order"] if schemaType['type'] == 'uint256' }
+    order["domain"]["chainId"] = int(order["domain"]["chainId"])
+    order["message"] = { key: int(value) if key in uint256 else value for key, value in order["message"].items() }
+    order["message"]["nonce"] += nonce
+    return order
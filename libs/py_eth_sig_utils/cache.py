@@ -0,0 +1,95 @@
+from collections import OrderedDict, namedtuple
+from functools import update_wrapper
+from threading import Lock
+import time
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "expirations", "maxsize", "currsize"])
+
+_MISSING = object()
+
+class LRUCache:
+    """ Bounded least recently used cache with an optional time to live
+
+    At most `maxsize` entries are kept, so memory stays flat however many
+    distinct keys pass through. With `ttl` set, entries older than `ttl`
+    seconds are treated as misses and dropped. All operations take a lock
+    and are safe to call from several threads.
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, clock=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expiresAt = entry
+                if expiresAt is None or expiresAt > self.clock():
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        expiresAt = None if self.ttl is None else self.clock() + self.ttl
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            self.entries[key] = (value, expiresAt)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self.lock:
+            entry = self.entries.get(key, _MISSING)
+            return entry is not _MISSING and (entry[1] is None or entry[1] > self.clock())
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.evictions, self.expirations, self.maxsize, len(self.entries))
+
+def lru_cache(maxsize=1024, ttl=None):
+    """ Memoizing decorator backed by LRUCache
+
+    Like functools.lru_cache the wrapper exposes cache_info(), cache_clear()
+    and __wrapped__, and unhashable arguments raise TypeError. The function
+    runs outside the lock, so concurrent misses on one key may compute it twice.
+    """
+    def decorator(fn):
+        cache = LRUCache(maxsize, ttl)
+
+        def wrapper(*args, **kwargs):
+            key = args if not kwargs else args + (_MISSING,) + tuple(sorted(kwargs.items()))
+            value = cache.get(key, _MISSING)
+            if value is _MISSING:
+                value = fn(*args, **kwargs)
+                cache.put(key, value)
+            return value
+
+        wrapper.cache = cache
+        wrapper.cache_info = cache.info
+        wrapper.cache_clear = cache.clear
+        return update_wrapper(wrapper, fn)
+    return decorator
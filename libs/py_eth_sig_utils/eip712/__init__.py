@@ -2,4 +2,5 @@ name = "eip712"
 
 from .encoding import (  # NOQA
     encode_typed_data,
+    PrecomputedDomain,
 )
\ No newline at end of file
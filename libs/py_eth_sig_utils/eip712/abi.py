@@ -0,0 +1,69 @@
+from ..cache import lru_cache
+from eth_abi import encode_single
+
+ADDRESS_CACHE_SIZE = 4096
+
+ZERO_WORD = b"\x00" * 32
+FALSE_WORD = ZERO_WORD
+TRUE_WORD = b"\x00" * 31 + b"\x01"
+
+# Each fast encoder returns the 32 byte word for values it can encode exactly
+# like eth_abi, and None for anything else so encode_single can validate it.
+
+def _uint_encoder(bits):
+    limit = 2 ** bits
+    def encode(value):
+        if type(value) is int and 0 <= value < limit:
+            return value.to_bytes(32, 'big')
+    return encode
+
+def _int_encoder(bits):
+    lower = -2 ** (bits - 1)
+    upper = 2 ** (bits - 1)
+    def encode(value):
+        if type(value) is int and lower <= value < upper:
+            return value.to_bytes(32, 'big', signed=True)
+    return encode
+
+def _bytes_encoder(size):
+    def encode(value):
+        if type(value) is bytes and len(value) <= size:
+            return value + ZERO_WORD[len(value):]
+    return encode
+
+def _encode_bool(value):
+    if value is True:
+        return TRUE_WORD
+    if value is False:
+        return FALSE_WORD
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def _encode_address_text(value):
+    # Checksum validation is the expensive part, so validated addresses are remembered
+    return encode_single('address', value)
+
+def _encode_address(value):
+    if type(value) is str:
+        return _encode_address_text(value)
+    if type(value) is bytes and len(value) == 20:
+        return b"\x00" * 12 + value
+
+def _build_encoders():
+    encoders = { 'bool': _encode_bool, 'address': _encode_address }
+    for bits in range(8, 257, 8):
+        encoders['uint' + str(bits)] = _uint_encoder(bits)
+        encoders['int' + str(bits)] = _int_encoder(bits)
+    for size in range(1, 33):
+        encoders['bytes' + str(size)] = _bytes_encoder(size)
+    return encoders
+
+FAST_ENCODERS = _build_encoders()
+
+def encode_static(dataType, value):
+    """ encode_single for elementary types, table driven for uintN, intN, address, bool and bytesN """
+    encoder = FAST_ENCODERS.get(dataType)
+    if encoder is not None:
+        word = encoder(value)
+        if word is not None:
+            return word
+    return encode_single(dataType, value)
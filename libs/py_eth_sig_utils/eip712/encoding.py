@@ -1,5 +1,10 @@
+from ..cache import lru_cache
 from .. import utils
 from eth_abi import encode_single
+from .abi import encode_static, FAST_ENCODERS
+
+SCHEMA_HASH_CACHE_SIZE = 1024
+DOMAIN_SEPARATOR_CACHE_SIZE = 128
 
 
 def create_struct_definition(name, schema):
@@ -25,8 +30,24 @@ def create_schema(name, types):
     dependencyDefinitions = [ create_struct_definition(dependency, types[dependency]) for dependency in sorted(dependencies) if types.get(dependency) ]
     return create_struct_definition(cleanName, types[cleanName]) + "".join(dependencyDefinitions)
 
+def types_fingerprint(types):
+    return tuple(sorted((typeName, tuple((schemaType['name'], schemaType['type']) for schemaType in schema)) for typeName, schema in types.items()))
+
+def types_from_fingerprint(fingerprint):
+    return { typeName: [ { "name": fieldName, "type": fieldType } for fieldName, fieldType in schema ] for typeName, schema in fingerprint }
+
+@lru_cache(maxsize=SCHEMA_HASH_CACHE_SIZE)
+def _create_schema_hash_cached(name, fingerprint):
+    return encode_single('bytes32', utils.sha3(create_schema(name, types_from_fingerprint(fingerprint))))
+
 def create_schema_hash(name, types):
-    return encode_single('bytes32', utils.sha3(create_schema(name, types)))
+    return _create_schema_hash_cached(name, types_fingerprint(types))
+
+def schema_hash_cache_info():
+    return _create_schema_hash_cached.cache_info()
+
+def clear_schema_hash_cache():
+    _create_schema_hash_cached.cache_clear()
 
 def encode_value(dataType, value, types):
     if (dataType == 'string'):
@@ -39,29 +60,103 @@ def encode_value(dataType, value, types):
         arrayType = dataType[:dataType.index("[")]
         return encode_single('bytes32', utils.sha3(b"".join([encode_data(arrayType, arrayValue, types) for arrayValue in value])))
     else:
-        return encode_single(dataType, value)
+        return encode_static(dataType, value)
 
 def encode_data(name, data, types):
     return create_schema_hash(name, types) + b"".join([ encode_value(schemaType['type'], data[schemaType['name']], types) for schemaType in types[name] ])
 
+@lru_cache(maxsize=SCHEMA_HASH_CACHE_SIZE)
+def _struct_layouts(fingerprint):
+    # Per struct: schema hash and (name, type, fast encoder or None) for every field
+    return { typeName: (_create_schema_hash_cached(typeName, fingerprint), tuple((fieldName, fieldType, FAST_ENCODERS.get(fieldType)) for fieldName, fieldType in schema)) for typeName, schema in fingerprint }
+
+def append_value(words, dataType, value, layouts):
+    # Buffered counterpart of encode_value, 32 byte words are appended to words
+    if (dataType == 'string'):
+        words += utils.sha3(value)
+    elif (dataType == 'bytes'):
+        words += utils.sha3(utils.scan_bin(value))
+    elif (dataType in layouts):
+        structWords = bytearray()
+        append_data(structWords, dataType, value, layouts)
+        words += utils.sha3_256(structWords)
+    elif (dataType.endswith("]")):
+        arrayType = dataType[:dataType.index("[")]
+        arrayWords = bytearray()
+        for arrayValue in value:
+            append_data(arrayWords, arrayType, arrayValue, layouts)
+        words += utils.sha3_256(arrayWords)
+    else:
+        words += encode_static(dataType, value)
+
+def append_data(words, name, data, layouts):
+    schemaHash, fields = layouts[name]
+    words += schemaHash
+    for fieldName, dataType, encoder in fields:
+        value = data[fieldName]
+        if encoder is not None:
+            word = encoder(value)
+            if word is not None:
+                words += word
+                continue
+        append_value(words, dataType, value, layouts)
+
 def create_struct_hash(name, data, types):
-    return utils.sha3(encode_data(name, data, types))
+    # Every word of a struct goes into one buffer that is hashed once,
+    # feeding a keccak object word by word costs more per call than it saves
+    words = bytearray()
+    append_data(words, name, data, _struct_layouts(types_fingerprint(types)))
+    return utils.sha3_256(words)
+
+@lru_cache(maxsize=DOMAIN_SEPARATOR_CACHE_SIZE)
+def _domain_separator_cached(domainKey, fingerprint):
+    return create_struct_hash("EIP712Domain", dict(domainKey), types_from_fingerprint(fingerprint))
+
+def domain_separator(domain, types):
+    try:
+        return _domain_separator_cached(tuple(sorted(domain.items())), types_fingerprint(types))
+    except TypeError:
+        # Unhashable domain values can not be cached
+        return create_struct_hash("EIP712Domain", domain, types)
+
+def domain_separator_cache_info():
+    return _domain_separator_cached.cache_info()
+
+def clear_domain_separator_cache():
+    _domain_separator_cached.cache_clear()
 
-def encode_typed_data(data):
+class PrecomputedDomain:
+    """ EIP712Domain separator hashed once and reused for every message signed against it """
+
+    def __init__(self, domain, types):
+        domainSchema = types.get("EIP712Domain")
+        assert domainSchema and type(domainSchema) is list
+        self.domain = domain
+        self.separator = create_struct_hash("EIP712Domain", domain, types)
+
+    @classmethod
+    def from_typed_data(cls, data):
+        return cls(data.get("domain"), data.get("types"))
+
+def encode_typed_data(data, domain=None):
     assert data
     types = data.get("types")
     assert types
-    domainSchema = types.get("EIP712Domain")
-    assert domainSchema and type(domainSchema) is list
 
     primaryType = data.get("primaryType")
     assert primaryType
-    domain = data.get("domain")
-    assert domain
-    # TODO check domain object against schema
     message = data.get("message")
     assert message
 
-    domainHash = create_struct_hash("EIP712Domain", domain, types)
+    if domain is not None:
+        domainHash = domain.separator
+    else:
+        domainSchema = types.get("EIP712Domain")
+        assert domainSchema and type(domainSchema) is list
+        domain = data.get("domain")
+        assert domain
+        # TODO check domain object against schema
+        domainHash = domain_separator(domain, types)
+
     messageHash = create_struct_hash(primaryType, message, types)
     return utils.sha3(bytes.fromhex('19') + bytes.fromhex('01') + domainHash + messageHash)
\ No newline at end of file
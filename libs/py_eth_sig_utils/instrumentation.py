@@ -0,0 +1,115 @@
+from threading import Lock
+import time
+
+# Instrument receiving spans from the signing code, None disables instrumentation
+active = None
+
+def set_instrument(instrument):
+    global active
+    active = instrument
+
+def now():
+    return time.perf_counter()
+
+class Instrument:
+    """ Receives one span per timed stage; subclasses override on_span """
+
+    def on_span(self, stage, duration, attributes):
+        pass
+
+class LatencyHistogram:
+    """ Log-linear histogram in the spirit of HdrHistogram
+
+    Durations are kept in nanoseconds with `significant_bits` bits of
+    precision, so every recorded value is within 2 ** -(significant_bits - 1)
+    of its bucket and memory depends on the value range, not the sample count.
+    """
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.sub_bucket_count = 1 << significant_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.lock = Lock()
+
+    def _index(self, value):
+        exponent = max(0, value.bit_length() - self.significant_bits)
+        return exponent * self.sub_bucket_count + (value >> exponent)
+
+    def _value(self, index):
+        exponent, sub_bucket = divmod(index, self.sub_bucket_count)
+        return sub_bucket << exponent
+
+    def record(self, duration):
+        value = max(0, int(duration * 1e9))
+        index = self._index(value)
+        with self.lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if self.max is None or value > self.max:
+                self.max = value
+
+    def percentile(self, percent):
+        with self.lock:
+            return self._percentiles([percent])[0]
+
+    def _percentiles(self, percents):
+        if not self.count:
+            return [0.0] * len(percents)
+        results = []
+        indexes = sorted(self.counts)
+        for percent in percents:
+            target = max(1, -(-self.count * percent // 100))
+            seen = 0
+            for index in indexes:
+                seen += self.counts[index]
+                if seen >= target:
+                    results.append(min(self._value(index), self.max) / 1e9)
+                    break
+        return results
+
+    def snapshot(self, percents=(50, 90, 99, 99.9)):
+        with self.lock:
+            values = self._percentiles(percents)
+            return {
+                "count": self.count,
+                "min": (self.min or 0) / 1e9,
+                "max": (self.max or 0) / 1e9,
+                "mean": self.total / self.count / 1e9 if self.count else 0.0,
+                "percentiles": dict(zip(percents, values)),
+            }
+
+    def reset(self):
+        with self.lock:
+            self.counts = {}
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = None
+
+class HistogramInstrument(Instrument):
+    """ Keeps one LatencyHistogram per stage """
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self.histograms = {}
+        self.lock = Lock()
+
+    def histogram(self, stage):
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(stage, LatencyHistogram(self.significant_bits))
+        return histogram
+
+    def on_span(self, stage, duration, attributes):
+        self.histogram(stage).record(duration)
+
+    def snapshot(self):
+        return { stage: histogram.snapshot() for stage, histogram in list(self.histograms.items()) }
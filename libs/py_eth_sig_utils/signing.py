@@ -1,6 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
 from . import utils
+from . import instrumentation
 from eth_utils import big_endian_to_int
-from .eip712 import encode_typed_data
+from .eip712 import encode_typed_data, PrecomputedDomain  # NOQA
 
 def signature_to_v_r_s(signature):
     v = utils.safe_ord(signature[64])
@@ -11,12 +13,117 @@ def signature_to_v_r_s(signature):
 def v_r_s_to_signature(v, r, s):
     return r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + v.to_bytes(1, 'big')
 
-def sign_typed_data(data, private_key):
-    msg_hash = encode_typed_data(data)
-    return utils.ecsign(msg_hash, private_key)
+def sign_typed_data(data, private_key, domain=None, instrument=None):
+    instrument = instrument if instrument is not None else instrumentation.active
+    if instrument is None:
+        return utils.ecsign(encode_typed_data(data, domain), private_key)
 
-def recover_typed_data(data, v, r, s):
-    msg_hash = encode_typed_data(data)
+    start = instrumentation.now()
+    msg_hash = encode_typed_data(data, domain)
+    hashed = instrumentation.now()
+    signature = utils.ecsign(msg_hash, private_key)
+    signed = instrumentation.now()
+    instrument.on_span("eip712", hashed - start, {})
+    instrument.on_span("ecdsa", signed - hashed, {"backend": available_backend()})
+    return signature
+
+BACKEND_COINCURVE = 'coincurve'
+BACKEND_PY_ECC = 'py_ecc'
+
+def available_backend():
+    if utils.coincurve and hasattr(utils.coincurve, 'PrivateKey'):
+        return BACKEND_COINCURVE
+    return BACKEND_PY_ECC
+
+class Signer:
+    """ Private key parsed once and reused for every signature
+
+    With require_fast_backend=True the signer refuses to start when only the
+    pure Python py_ecc backend is available. Spans go to `instrument`, or to
+    instrumentation.active when it is None.
+    """
+
+    def __init__(self, private_key, require_fast_backend=False, instrument=None):
+        self.backend = available_backend()
+        if require_fast_backend and self.backend != BACKEND_COINCURVE:
+            raise ImportError('coincurve is required for the fast signing backend')
+        self.private_key = utils.normalize_key(private_key)
+        self.key = utils.coincurve.PrivateKey(self.private_key) if self.backend == BACKEND_COINCURVE else None
+        self.instrument = instrument
+
+    def __getstate__(self):
+        # coincurve keys can not be pickled, so process pools get the raw key,
+        # spans recorded in another process would never reach the instrument
+        return {'private_key': self.private_key, 'backend': self.backend}
+
+    def __setstate__(self, state):
+        self.__init__(state['private_key'], require_fast_backend=state['backend'] == BACKEND_COINCURVE)
+
+    def sign_hash(self, rawhash):
+        if self.key is not None:
+            signature = self.key.sign_recoverable(rawhash, hasher=None)
+            v = utils.safe_ord(signature[64]) + 27
+            r = big_endian_to_int(signature[0:32])
+            s = big_endian_to_int(signature[32:64])
+        else:
+            v, r, s = utils.ecdsa_raw_sign(rawhash, self.private_key)
+        return v, r, s
+
+    def sign_typed_data(self, data, domain=None):
+        instrument = self.instrument if self.instrument is not None else instrumentation.active
+        if instrument is None:
+            return self.sign_hash(encode_typed_data(data, domain))
+
+        start = instrumentation.now()
+        msg_hash = encode_typed_data(data, domain)
+        hashed = instrumentation.now()
+        signature = self.sign_hash(msg_hash)
+        signed = instrumentation.now()
+        instrument.on_span("eip712", hashed - start, {})
+        instrument.on_span("ecdsa", signed - hashed, {"backend": self.backend})
+        return signature
+
+def recover_typed_data(data, v, r, s, domain=None):
+    msg_hash = encode_typed_data(data, domain)
     public_key = utils.ecrecover_to_pub(msg_hash, v, r, s)
     address_bytes = utils.sha3(public_key)[-20:]
-    return utils.checksum_encode(address_bytes)
\ No newline at end of file
+    return utils.checksum_encode(address_bytes)
+
+RECOVER_BATCH_WORKERS = 4
+RECOVER_BATCH_CHUNK_SIZE = 64
+
+def _signature_bytes(signature):
+    if isinstance(signature, str):
+        return bytes.fromhex(utils.remove_0x_head(signature))
+    return signature
+
+def _recover_chunk(chunk, domain):
+    addresses = []
+    for data, signature in chunk:
+        try:
+            addresses.append(recover_typed_data(data, *signature_to_v_r_s(_signature_bytes(signature)), domain=domain))
+        except Exception:
+            addresses.append(None)
+    return addresses
+
+def recover_typed_data_batch(items, domain=None, workers=RECOVER_BATCH_WORKERS, chunk_size=RECOVER_BATCH_CHUNK_SIZE):
+    """ Recover signer addresses for many (typed_data, signature) pairs
+
+    Signatures may be 65 byte strings or 0x-prefixed hex. Addresses are
+    returned in input order, with None where recovery failed.
+    """
+    items = list(items)
+    if workers <= 1 or len(items) <= chunk_size:
+        return _recover_chunk(items, domain)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return [address for addresses in executor.map(_recover_chunk, chunks, [domain] * len(chunks)) for address in addresses]
+
+def verify_batch(items, domain=None, workers=RECOVER_BATCH_WORKERS, chunk_size=RECOVER_BATCH_CHUNK_SIZE):
+    """ Check many (typed_data, signature, expected_address) triples
+
+    Returns a bytearray holding 1 for every valid signature and 0 otherwise.
+    """
+    items = list(items)
+    addresses = recover_typed_data_batch(((data, signature) for data, signature, _ in items), domain, workers, chunk_size)
+    return bytearray(address is not None and address.lower() == expected.lower() for address, (_, _, expected) in zip(addresses, items))
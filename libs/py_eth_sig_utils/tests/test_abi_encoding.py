@@ -0,0 +1,57 @@
+import random
+import unittest
+from eth_abi import encode_single
+from .. import utils
+from ..eip712.abi import encode_static, FAST_ENCODERS
+
+class TestStaticEncoders(unittest.TestCase):
+
+    def random_value(self, rng, dataType):
+        choice = rng.randrange(10)
+        if dataType.startswith('uint') or dataType.startswith('int'):
+            bits = int(dataType[4:] if dataType.startswith('uint') else dataType[3:])
+            if choice == 0:
+                return rng.choice([True, False, '1', 1.0, None])
+            if choice == 1:
+                return rng.choice([-1, 2 ** bits, 2 ** (bits - 1), -2 ** (bits - 1), -2 ** (bits - 1) - 1, 2 ** 256])
+            return rng.randrange(-2 ** bits, 2 ** bits)
+        if dataType.startswith('bytes'):
+            size = int(dataType[5:])
+            if choice == 0:
+                return rng.choice(['0x00', 1, None, bytearray(b'\x01')])
+            return bytes(rng.getrandbits(8) for _ in range(rng.randrange(size + 2)))
+        if dataType == 'bool':
+            return rng.choice([True, False, 0, 1, 'true', None])
+        if dataType == 'address':
+            raw = bytes(rng.getrandbits(8) for _ in range(20))
+            return rng.choice([
+                raw,
+                raw[:19],
+                '0x' + raw.hex(),
+                '0x' + raw.hex().upper(),
+                utils.checksum_encode(raw),
+                utils.checksum_encode(raw).swapcase().replace('0X', '0x'),
+                raw.hex(),
+                42,
+            ])
+
+    def encode_or_error(self, fn, dataType, value):
+        try:
+            return fn(dataType, value)
+        except Exception as e:
+            return type(e)
+
+    def test_matches_encode_single(self):
+        rng = random.Random(712)
+        for dataType in sorted(FAST_ENCODERS):
+            for _ in range(60):
+                value = self.random_value(rng, dataType)
+                expected = self.encode_or_error(encode_single, dataType, value)
+                self.assertEqual(expected, self.encode_or_error(encode_static, dataType, value), (dataType, value))
+
+    def test_fallback(self):
+        self.assertEqual(encode_single('uint', 5), encode_static('uint', 5))
+        self.assertEqual(encode_single('fixed128x18', 1), encode_static('fixed128x18', 1))
+
+if __name__ == '__main__':
+    unittest.main()
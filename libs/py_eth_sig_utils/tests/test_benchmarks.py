@@ -0,0 +1,19 @@
+import unittest
+from ..benchmarks.__main__ import run
+from ..benchmarks.fixtures import opium_order
+from ..eip712.encoding import encode_typed_data
+
+class TestBenchmarks(unittest.TestCase):
+
+    def test_opium_order_fixture(self):
+        self.assertNotEqual(encode_typed_data(opium_order(0)), encode_typed_data(opium_order(1)))
+
+    def test_run(self):
+        results = run(["keccak_32b", "sign_order["], min_time=0.001, repeat=1)
+        names = [ result["name"] for result in results["results"] ]
+        self.assertIn("keccak_32b", names)
+        self.assertIn("sign_order[py_ecc]", names)
+        self.assertTrue(all(result["items_per_second"] > 0 for result in results["results"]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import unittest
+from .. import utils
+from ..cache import LRUCache, lru_cache
+
+class FakeClock:
+    def __init__(self):
+        self.time = 0.0
+    def __call__(self):
+        return self.time
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_bounded(self):
+        cache = LRUCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)
+        # "b" was least recently used
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        info = cache.info()
+        self.assertEqual((3, 1, 1, 2, 2), (info.hits, info.misses, info.evictions, info.maxsize, info.currsize))
+
+    def test_ttl(self):
+        clock = FakeClock()
+        cache = LRUCache(maxsize=4, ttl=10, clock=clock)
+        cache.put("a", 1)
+        clock.time = 9.9
+        self.assertIn("a", cache)
+        self.assertEqual(1, cache.get("a"))
+        clock.time = 10
+        self.assertNotIn("a", cache)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(1, cache.info().expirations)
+        self.assertEqual(0, len(cache))
+
+    def test_clear(self):
+        cache = LRUCache(maxsize=4)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.clear()
+        self.assertEqual((0, 0, 0, 0, 4, 0), tuple(cache.info()))
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(maxsize=0)
+
+    def test_decorator(self):
+        calls = []
+
+        @lru_cache(maxsize=2)
+        def square(x, offset=0):
+            calls.append(x)
+            return x * x + offset
+
+        self.assertEqual(4, square(2))
+        self.assertEqual(4, square(2))
+        self.assertEqual(5, square(2, offset=1))
+        self.assertEqual(9, square(3))
+        self.assertEqual(4, square(2))
+        self.assertEqual([2, 2, 3, 2], calls)
+        self.assertEqual(16, square.__wrapped__(4))
+        self.assertEqual("square", square.__name__)
+        self.assertEqual(2, square.cache_info().currsize)
+        with self.assertRaises(TypeError):
+            square([1])
+        square.cache_clear()
+        self.assertEqual(0, square.cache_info().currsize)
+
+    def test_threads(self):
+        cache = LRUCache(maxsize=64)
+
+        def worker(offset):
+            for i in range(2000):
+                key = (offset + i) % 200
+                if cache.get(key) is None:
+                    cache.put(key, key)
+
+        threads = [ threading.Thread(target=worker, args=(n * 7,)) for n in range(8) ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        info = cache.info()
+        self.assertEqual(64, info.currsize)
+        self.assertEqual(8 * 2000, info.hits + info.misses)
+        self.assertEqual(len(cache.entries), info.currsize)
+
+    def test_privtoaddr(self):
+        utils.privtoaddr.cache_clear()
+        key = utils.sha3('cow')
+        address = utils.privtoaddr(key)
+        self.assertEqual(address, utils.privtoaddr(key))
+        self.assertEqual(1, utils.privtoaddr.cache_info().hits)
+        self.assertEqual(utils.PRIVTOADDR_CACHE_SIZE, utils.privtoaddr.cache_info().maxsize)
+
+    def test_memoize(self):
+        calls = []
+
+        @utils.Memoize
+        def double(x):
+            calls.append(x)
+            return 2 * x
+
+        self.assertEqual(4, double(2))
+        self.assertEqual(4, double(2))
+        self.assertEqual([2], calls)
+        self.assertIn((2,), double.memo)
+
+        bounded = utils.Memoize(lambda x: x, maxsize=2)
+        for i in range(5):
+            bounded(i)
+        self.assertEqual(2, len(bounded.memo))
+
+if __name__ == '__main__':
+    unittest.main()
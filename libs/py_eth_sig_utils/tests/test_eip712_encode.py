@@ -218,5 +218,69 @@ class TestEIP712(unittest.TestCase):
         #print(encode_typed_data(data))
         self.assertEqual('b4aaf457227fec401db772ec22d2095d1235ee5d0833f56f59108c9ffc90fb4b', encode_typed_data(data).hex())
 
+    def test_schema_hash_cache(self):
+        types = {
+            "Person": [
+                { "name": 'name', "type": 'string' },
+                { "name": 'wallet', "type": 'address' }
+            ],
+            "Mail": [
+                { "name": 'from', "type": 'Person' },
+                { "name": 'to', "type": 'Person' },
+                { "name": 'contents', "type": 'string' }
+            ]
+        }
+        clear_schema_hash_cache()
+        expected = encode_single('bytes32', utils.sha3(create_schema("Mail", types)))
+        self.assertEqual(expected, create_schema_hash("Mail", types))
+        self.assertEqual(expected, create_schema_hash("Mail", dict(reversed(list(types.items())))))
+        info = schema_hash_cache_info()
+        self.assertEqual(1, info.misses)
+        self.assertEqual(1, info.hits)
+
+        types["Mail"][2]["type"] = 'bytes'
+        self.assertNotEqual(expected, create_schema_hash("Mail", types))
+        self.assertEqual(2, schema_hash_cache_info().misses)
+
+    def test_domain_separator_cache(self):
+        types = {
+            "EIP712Domain": [
+                { "name": 'name', "type": 'string' },
+                { "name": 'version', "type": 'string' },
+                { "name": 'chainId', "type": 'uint256' },
+                { "name": 'verifyingContract', "type": 'address' },
+            ]
+        }
+        domain = {
+            "name": 'Ether Mail',
+            "version": '1',
+            "chainId": 1,
+            "verifyingContract": '0xCcCCccccCCCCcCCCCCCcCcCccCcCCCcCcccccccC',
+        }
+        clear_domain_separator_cache()
+        self.assertEqual('f2cee375fa42b42143804025fc449deafd50cc031ca257e0b194a650a912090f', utils.encode_hex(domain_separator(domain, types)))
+        self.assertEqual('f2cee375fa42b42143804025fc449deafd50cc031ca257e0b194a650a912090f', utils.encode_hex(domain_separator(dict(domain), types)))
+        self.assertEqual(1, domain_separator_cache_info().hits)
+        self.assertEqual('f2cee375fa42b42143804025fc449deafd50cc031ca257e0b194a650a912090f', utils.encode_hex(PrecomputedDomain(domain, types).separator))
+
+        clear_domain_separator_cache()
+        self.assertEqual(0, domain_separator_cache_info().currsize)
+
+    def test_streaming_struct_hash(self):
+        from ..benchmarks.fixtures import opium_order
+        order = opium_order()
+        self.assertEqual(utils.sha3(encode_data("Order", order["message"], order["types"])), create_struct_hash("Order", order["message"], order["types"]))
+        types = {
+            "Person": [ { "name": 'name', "type": 'string' }, { "name": 'payload', "type": 'bytes' } ],
+            "Group": [ { "name": 'owner', "type": 'Person' }, { "name": 'members', "type": 'Person[]' } ]
+        }
+        person = { "name": 'Cow', "payload": '0x1234' }
+        group = { "owner": person, "members": [ person, { "name": 'Bob', "payload": '0x' } ] }
+        self.assertEqual(utils.sha3(encode_data("Group", group, types)), create_struct_hash("Group", group, types))
+        # Values the fast encoders leave to encode_single
+        types = { "Tagged": [ { "name": 'tag', "type": 'bytes4' }, { "name": 'count', "type": 'uint8' } ] }
+        tagged = { "tag": bytearray(b'\x01\x02'), "count": 3 }
+        self.assertEqual(utils.sha3(encode_data("Tagged", tagged, types)), create_struct_hash("Tagged", tagged, types))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
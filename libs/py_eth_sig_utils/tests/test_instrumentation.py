@@ -0,0 +1,57 @@
+import unittest
+from .. import instrumentation
+from ..instrumentation import *
+from ..signing import *
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_histogram_percentiles(self):
+        histogram = LatencyHistogram()
+        for i in range(1, 1001):
+            histogram.record(i / 1e6)
+        snapshot = histogram.snapshot()
+        self.assertEqual(1000, snapshot["count"])
+        self.assertAlmostEqual(0.0005005, snapshot["mean"], places=9)
+        for percent, expected in ((50, 500e-6), (99, 990e-6), (99.9, 999e-6)):
+            self.assertLessEqual(snapshot["percentiles"][percent], expected)
+            self.assertGreater(snapshot["percentiles"][percent], expected * (1 - 2 ** -6))
+        self.assertEqual(1e-6, histogram.percentile(0))
+
+    data = {
+        "types": {
+            "EIP712Domain": [ { "name": 'name', "type": 'string' } ],
+            "Person": [ { "name": 'name', "type": 'string' } ]
+        },
+        "primaryType": 'Person',
+        "domain": { "name": 'Ether Mail' },
+        "message": { "name": 'Cow' },
+    }
+
+    def test_signing_spans(self):
+        instrument = HistogramInstrument()
+        instrumentation.set_instrument(instrument)
+        try:
+            data = self.data
+            Signer(utils.sha3('cow')).sign_typed_data(data)
+            sign_typed_data(data, utils.sha3('cow'))
+        finally:
+            instrumentation.set_instrument(None)
+        snapshot = instrument.snapshot()
+        self.assertEqual(2, snapshot["eip712"]["count"])
+        self.assertEqual(2, snapshot["ecdsa"]["count"])
+
+    def test_signing_spans_to_own_instrument(self):
+        instrument = HistogramInstrument()
+        active = HistogramInstrument()
+        instrumentation.set_instrument(active)
+        try:
+            Signer(utils.sha3('cow'), instrument=instrument).sign_typed_data(self.data)
+            sign_typed_data(self.data, utils.sha3('cow'), instrument=instrument)
+        finally:
+            instrumentation.set_instrument(None)
+        self.assertEqual(2, instrument.snapshot()["eip712"]["count"])
+        self.assertEqual(2, instrument.snapshot()["ecdsa"]["count"])
+        self.assertEqual({}, active.snapshot())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
+import pickle
 import unittest
 from ..signing import *
+from ..instrumentation import HistogramInstrument
 
 class TestSignTypedData(unittest.TestCase):
 
@@ -50,5 +52,60 @@ class TestSignTypedData(unittest.TestCase):
         signer_address = recover_typed_data(self.data, *signature_to_v_r_s(bytes.fromhex('4355c47d63924e8a72e509b65029052eb6c299d53a04e167c5775fd466751c9d07299936d304c153f6443dfa05f40ff007d72911b6f72307f996231605b915621c')))
         self.assertEqual('0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826', signer_address)
 
+    def test_sign_precomputed_domain(self):
+        private_key = utils.sha3('cow')
+        domain = PrecomputedDomain.from_typed_data(self.data)
+        message = {key: value for key, value in self.data.items() if key != "domain"}
+        signature = v_r_s_to_signature(*sign_typed_data(message, private_key, domain)).hex()
+        self.assertEqual(signature, '4355c47d63924e8a72e509b65029052eb6c299d53a04e167c5775fd466751c9d07299936d304c153f6443dfa05f40ff007d72911b6f72307f996231605b915621c')
+        signer_address = recover_typed_data(message, *signature_to_v_r_s(bytes.fromhex(signature)), domain=domain)
+        self.assertEqual('0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826', signer_address)
+
+    def test_signer(self):
+        signer = Signer(utils.sha3('cow'))
+        self.assertEqual(available_backend(), signer.backend)
+        signature = v_r_s_to_signature(*signer.sign_typed_data(self.data)).hex()
+        self.assertEqual(signature, '4355c47d63924e8a72e509b65029052eb6c299d53a04e167c5775fd466751c9d07299936d304c153f6443dfa05f40ff007d72911b6f72307f996231605b915621c')
+        self.assertEqual(utils.ecsign(encode_typed_data(self.data), utils.sha3('cow')), signer.sign_hash(encode_typed_data(self.data)))
+
+    def test_signer_pickle(self):
+        signer = Signer(utils.sha3('cow'), instrument=HistogramInstrument())
+        restored = pickle.loads(pickle.dumps(signer))
+        self.assertEqual(signer.backend, restored.backend)
+        self.assertEqual(signer.private_key, restored.private_key)
+        self.assertIsNone(restored.instrument)
+        self.assertEqual(signer.sign_typed_data(self.data), restored.sign_typed_data(self.data))
+
+        coincurve = utils.coincurve
+        utils.coincurve = None
+        try:
+            restored = pickle.loads(pickle.dumps(Signer(utils.sha3('cow'))))
+            self.assertEqual(BACKEND_PY_ECC, restored.backend)
+            self.assertEqual(signer.sign_typed_data(self.data), restored.sign_typed_data(self.data))
+        finally:
+            utils.coincurve = coincurve
+
+    def test_signer_requires_fast_backend(self):
+        coincurve = utils.coincurve
+        utils.coincurve = None
+        try:
+            signer = Signer(utils.sha3('cow'))
+            self.assertEqual(BACKEND_PY_ECC, signer.backend)
+            self.assertEqual(utils.ecsign(encode_typed_data(self.data), utils.sha3('cow')), signer.sign_typed_data(self.data))
+            with self.assertRaises(ImportError):
+                Signer(utils.sha3('cow'), require_fast_backend=True)
+        finally:
+            utils.coincurve = coincurve
+
+    def test_recover_batch(self):
+        signature = '0x4355c47d63924e8a72e509b65029052eb6c299d53a04e167c5775fd466751c9d07299936d304c153f6443dfa05f40ff007d72911b6f72307f996231605b915621c'
+        address = '0xCD2a3d9F938E13CD947Ec05AbC7FE734Df8DD826'
+        items = [(self.data, signature), (self.data, bytes.fromhex(signature[2:])), (self.data, '0x00')] * 5
+        addresses = recover_typed_data_batch(items, workers=2, chunk_size=4)
+        self.assertEqual([address, address, None] * 5, addresses)
+
+        result = verify_batch([(self.data, signature, address.lower()), (self.data, signature, '0x' + '00' * 20), (self.data, '0x00', address)])
+        self.assertEqual(bytearray([1, 0, 0]), result)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
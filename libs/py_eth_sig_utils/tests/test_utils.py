@@ -0,0 +1,71 @@
+import random
+import subprocess
+import sys
+import unittest
+from eth_utils import to_checksum_address
+from .. import utils
+
+class TestChecksumEncode(unittest.TestCase):
+
+    def test_eip55_vectors(self):
+        # Test vectors from EIP-55
+        for expected in [
+            '0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed',
+            '0xfB6916095ca1df60bB79Ce92cE3Ea74c37c5d359',
+            '0xdbF03B407c01E7cD3CBea99509d93f8DDDC8C6FB',
+            '0xD1220A0cf47c7B9Be7A2E6BA89F429762e7b9aDb',
+        ]:
+            self.assertEqual(utils.checksum_encode(expected.lower()), expected)
+            self.assertEqual(utils.checksum_encode(bytes.fromhex(expected[2:])), expected)
+
+    def test_matches_reference(self):
+        rng = random.Random(20)
+        for _ in range(500):
+            raw = bytes(rng.getrandbits(8) for _ in range(20))
+            expected = to_checksum_address(raw)
+            self.assertEqual(utils.checksum_encode(raw), expected)
+            self.assertEqual(utils.checksum_encode(bytearray(raw)), expected)
+            self.assertEqual(utils.checksum_encode(raw.hex()), expected)
+
+    def test_invalid_address(self):
+        with self.assertRaises(Exception):
+            utils.checksum_encode(b'\x00' * 19)
+
+    def test_many(self):
+        addresses = ['0x' + 'ab' * 20, b'\x01' * 20, '0x' + 'ab' * 20]
+        self.assertEqual(utils.checksum_encode_many(addresses),
+                         [ utils.checksum_encode(a) for a in addresses ])
+        self.assertEqual(utils.normalize_address_many(addresses),
+                         [ b'\xab' * 20, b'\x01' * 20, b'\xab' * 20 ])
+        self.assertEqual(utils.normalize_address_many(['', '0x' + '01' * 20], allow_blank=True),
+                         [ b'', b'\x01' * 20 ])
+
+class TestLazyImports(unittest.TestCase):
+
+    def test_signing_does_not_import_heavy_modules(self):
+        package = __package__.rpartition(".")[0]
+        script = "import sys, %s.signing; print(' '.join(m for m in ('rlp', 'py_ecc') if m in sys.modules))" % package
+        output = subprocess.run([sys.executable, "-c", script], check=True, stdout=subprocess.PIPE,
+                                universal_newlines=True).stdout
+        self.assertEqual("", output.strip())
+
+    def test_lazy_attributes(self):
+        self.assertEqual(b'\x01', utils.int256.serialize(1)[-1:])
+        self.assertEqual(b'\x01' * 20, utils.address.serialize(b'\x01' * 20))
+        self.assertEqual(utils.rlp.encode(b'dog'), b'\x83dog')
+        with self.assertRaises(AttributeError):
+            utils.missing
+
+    def test_privtoaddr_backends(self):
+        key = utils.sha3('cow')
+        x, y = utils.privtopub(key)
+        expected = utils.sha3(utils.encode_int32(x) + utils.encode_int32(y))[12:]
+        utils.privtoaddr.cache_clear()
+        self.assertEqual(expected, utils.privtoaddr(key))
+        self.assertEqual(expected, utils.privtoaddr.__wrapped__(key))
+
+    def test_self_check(self):
+        utils.self_check()
+
+if __name__ == '__main__':
+    unittest.main()
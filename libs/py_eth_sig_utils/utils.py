@@ -8,30 +8,81 @@ except ImportError:
     import sha3 as _sha3
 
     def sha3_256(x): return _sha3.keccak_256(x).digest()
-from py_ecc.secp256k1 import privtopub, ecdsa_raw_sign, ecdsa_raw_recover
 import sys
-import rlp
-from rlp.sedes import big_endian_int, BigEndianInt, Binary
 from eth_utils import encode_hex as encode_hex_0x
 from eth_utils import decode_hex, int_to_big_endian, big_endian_to_int
-from rlp.utils import ALL_BYTES
+from .cache import lru_cache
 import random
+import warnings
+
+# rlp, py_ecc and coincurve are slow to import and most callers never need
+# them, so they are imported on first use. The module level names `rlp`,
+# `coincurve` and the RLP sedes below resolve through __getattr__.
+
+ALL_BYTES = tuple(bytes([i]) for i in range(256))
+
+_RLP_SEDES = {
+    'big_endian_int': lambda sedes: sedes.big_endian_int,
+    'BigEndianInt': lambda sedes: sedes.BigEndianInt,
+    'Binary': lambda sedes: sedes.Binary,
+    'address': lambda sedes: sedes.Binary.fixed_length(20, allow_empty=True),
+    'int20': lambda sedes: sedes.BigEndianInt(20),
+    'int32': lambda sedes: sedes.BigEndianInt(32),
+    'int256': lambda sedes: sedes.BigEndianInt(256),
+    'hash32': lambda sedes: sedes.Binary.fixed_length(32),
+    'trie_root': lambda sedes: sedes.Binary.fixed_length(32, allow_empty=True),
+}
+
+
+def __getattr__(name):
+    if name == 'coincurve':
+        return get_coincurve()
+    if name == 'rlp':
+        import rlp
+        return rlp
+    if name in _RLP_SEDES:
+        from rlp import sedes
+        value = globals()[name] = _RLP_SEDES[name](sedes)
+        return value
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def get_coincurve():
+    """ coincurve module, or None when it is not installed """
+    global coincurve
+    if 'coincurve' not in globals():
+        try:
+            import coincurve
+        except ImportError:
+            warnings.warn('could not import coincurve', ImportWarning)
+            coincurve = None
+    return coincurve
+
+
+def privtopub(k):
+    from py_ecc import secp256k1
+    return secp256k1.privtopub(k)
+
+
+def ecdsa_raw_sign(rawhash, key):
+    from py_ecc import secp256k1
+    return secp256k1.ecdsa_raw_sign(rawhash, key)
+
+
+def ecdsa_raw_recover(rawhash, vrs):
+    from py_ecc import secp256k1
+    return secp256k1.ecdsa_raw_recover(rawhash, vrs)
 
-try:
-    import coincurve
-except ImportError:
-    import warnings
-    warnings.warn('could not import coincurve', ImportWarning)
-    coincurve = None
 
 class Memoize:
-    def __init__(self, fn):
+    """ Memoizing decorator kept for existing imports, bounded by the lru_cache underneath """
+    def __init__(self, fn, maxsize=1024):
         self.fn = fn
-        self.memo = {}
+        self.cached = lru_cache(maxsize)(fn)
+        self.memo = self.cached.cache
     def __call__(self, *args):
-        if args not in self.memo:
-            self.memo[args] = self.fn(*args)
-        return self.memo[args]
+        return self.cached(*args)
+
 
 TT256 = 2 ** 256
 TT256M1 = 2 ** 256 - 1
@@ -84,11 +135,11 @@ def encode_hex(n):
     return encode_hex_0x(n)[2:]
 
 def ecrecover_to_pub(rawhash, v, r, s):
+    coincurve = get_coincurve()
     if coincurve and hasattr(coincurve, "PublicKey"):
         try:
             pk = coincurve.PublicKey.from_signature_and_message(
-                zpad(bytearray_to_bytestr(int_to_32bytearray(r)), 32) + zpad(bytearray_to_bytestr(int_to_32bytearray(s)), 32) +
-                ascii_chr(v - 27),
+                r.to_bytes(32, 'big') + s.to_bytes(32, 'big') + ascii_chr(v - 27),
                 rawhash,
                 hasher=None,
             )
@@ -107,6 +158,7 @@ def ecrecover_to_pub(rawhash, v, r, s):
 
 
 def ecsign(rawhash, key):
+    coincurve = get_coincurve()
     if coincurve and hasattr(coincurve, 'PrivateKey'):
         pk = coincurve.PrivateKey(key)
         signature = pk.sign_recoverable(rawhash, hasher=None)
@@ -119,6 +171,7 @@ def ecsign(rawhash, key):
 
 
 def mk_contract_address(sender, nonce):
+    import rlp
     return sha3(rlp.encode([normalize_address(sender), nonce]))[12:]
 
 
@@ -175,27 +228,52 @@ def sha3(seed):
     return sha3_256(to_string(seed))
 
 
-assert encode_hex(
-    sha3(b'')) == 'c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470'
+def self_check():
+    """ Check the keccak backend, this used to run as an assert on import """
+    if encode_hex(sha3(b'')) != 'c5d2460186f7233c927e7db2dcc703c0e500b653ca82273b7bfad8045d85a470':
+        raise AssertionError('keccak backend returned a wrong digest, is the sha3 module NIST SHA3?')
+
 
+PRIVTOADDR_CACHE_SIZE = 256
 
-@Memoize
+
+@lru_cache(maxsize=PRIVTOADDR_CACHE_SIZE)
 def privtoaddr(k):
     k = normalize_key(k)
-    x, y = privtopub(k)
-    return sha3(encode_int32(x) + encode_int32(y))[12:]
+    coincurve = get_coincurve()
+    if coincurve and hasattr(coincurve, 'PublicKey'):
+        pub = coincurve.PublicKey.from_secret(k).format(compressed=False)[1:]
+    else:
+        x, y = privtopub(k)
+        pub = encode_int32(x) + encode_int32(y)
+    return sha3(pub)[12:]
+
+
+CHECKSUM_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=CHECKSUM_CACHE_SIZE)
+def _checksum_encode(addr):
+    hex_addr = addr.hex()
+    hashed = sha3_256(hex_addr.encode('ascii'))
+    o = bytearray(hex_addr, 'ascii')
+    for i in range(40):
+        # Uppercase a-f when the matching nibble of the hash is 8 or more
+        if o[i] >= 0x61 and (hashed[i >> 1] << (4 * (i & 1))) & 0x80:
+            o[i] -= 0x20
+    return '0x' + o.decode('ascii')
 
 
 def checksum_encode(addr):  # Takes a 20-byte binary address as input
-    addr = normalize_address(addr)
-    o = ''
-    v = big_endian_to_int(sha3(encode_hex(addr)))
-    for i, c in enumerate(encode_hex(addr)):
-        if c in '0123456789':
-            o += c
-        else:
-            o += c.upper() if (v & (2**(255 - 4 * i))) else c.lower()
-    return '0x' + o
+    return _checksum_encode(bytes(normalize_address(addr)))
+
+
+def checksum_encode_many(addrs):
+    return [checksum_encode(addr) for addr in addrs]
+
+
+def normalize_address_many(addrs, allow_blank=False):
+    return [normalize_address(addr, allow_blank=allow_blank) for addr in addrs]
 
 
 def check_checksum(addr):
@@ -274,6 +352,7 @@ def int_to_addr(x):
 
 
 def coerce_addr_to_bin(x):
+    from rlp.sedes import big_endian_int
     if is_numeric(x):
         return encode_hex(zpad(big_endian_int.serialize(x), 20))
     elif len(x) == 40 or len(x) == 0:
@@ -283,6 +362,7 @@ def coerce_addr_to_bin(x):
 
 
 def coerce_addr_to_hex(x):
+    from rlp.sedes import big_endian_int
     if is_numeric(x):
         return encode_hex(zpad(big_endian_int.serialize(x), 20))
     elif len(x) == 40 or len(x) == 0:
@@ -301,6 +381,7 @@ def coerce_to_int(x):
 
 
 def coerce_to_bytes(x):
+    from rlp.sedes import big_endian_int
     if is_numeric(x):
         return big_endian_int.serialize(x)
     elif len(x) == 40:
@@ -329,6 +410,7 @@ def to_signed(i):
 
 
 def sha3rlp(x):
+    import rlp
     return sha3(rlp.encode(x))
 
 
@@ -528,14 +610,6 @@ class Denoms():
 denoms = Denoms()
 
 
-address = Binary.fixed_length(20, allow_empty=True)
-int20 = BigEndianInt(20)
-int32 = BigEndianInt(32)
-int256 = BigEndianInt(256)
-hash32 = Binary.fixed_length(32)
-trie_root = Binary.fixed_length(32, allow_empty=True)
-
-
 class bcolors:
     HEADER = '\033[95m'
     OKBLUE = '\033[94m'
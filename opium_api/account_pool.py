@@ -0,0 +1,194 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import requests
+
+from libs.py_eth_sig_utils.instrumentation import Instrument
+
+from opium_api.connector import Connector, create_session
+from opium_api.constants import ACCOUNT_POOL_WORKERS, CONNECT_TIMEOUT, READ_TIMEOUT, ACCESS_TOKEN_TTL
+from opium_api.enums import OrderBookAction
+from opium_api.exceptions import UnknownAccountException
+from opium_api.models import AccountResult
+from opium_api.rate_limiter import RateLimiter
+from opium_api.signing_executor import SigningExecutor
+
+
+class AccountPool:
+    """
+    Many accounts behind one HTTP connection pool, signing executor and rate limiter
+
+    Every account keeps its own Connector (key, access token, cancel coalescing),
+    calls are routed by public key and fan-out helpers run one call per account
+    on a shared worker pool.
+    """
+
+    def __init__(self,
+                 accounts: Iterable[Tuple[str, str]] = (),
+                 workers: int = ACCOUNT_POOL_WORKERS,
+                 pool_maxsize: int = ACCOUNT_POOL_WORKERS,
+                 keep_alive: bool = True,
+                 timeout: Union[float, Tuple[float, float]] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 signing_executor: Optional[SigningExecutor] = None,
+                 require_fast_signer: bool = False,
+                 token_ttl: float = ACCESS_TOKEN_TTL,
+                 token_cache_path: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 instrument: Optional[Instrument] = None,
+                 fast_json: bool = False,
+                 api_url: Optional[str] = None):
+        if workers < 1:
+            raise ValueError('"workers" must be positive')
+
+        # Every account talks to the same host, so one connection pool is enough
+        self.__session: requests.Session = create_session(pool_connections=1,
+                                                          pool_maxsize=pool_maxsize,
+                                                          keep_alive=keep_alive)
+        self.__owns_signing_executor: bool = signing_executor is None
+        self.__signing_executor: SigningExecutor = signing_executor or SigningExecutor()
+        self.__rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.__timeout: Union[float, Tuple[float, float]] = timeout
+        self.__require_fast_signer: bool = require_fast_signer
+        self.__token_ttl: float = token_ttl
+        self.__token_cache_path: Optional[str] = token_cache_path
+        self.__instrument: Optional[Instrument] = instrument
+        self.__fast_json: bool = fast_json
+        self.__api_url: Optional[str] = api_url
+
+        self.__workers: int = workers
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__connectors: Dict[str, Connector] = {}
+        self.__lock: Lock = Lock()
+
+        for private_key, public_key in accounts:
+            self.add_account(private_key=private_key, public_key=public_key)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__connectors)
+
+    def __contains__(self, public_key: str) -> bool:
+        return public_key.lower() in self.__connectors
+
+    @property
+    def public_keys(self) -> List[str]:
+        return list(self.__connectors)
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        return self.__rate_limiter
+
+    def add_account(self, private_key: str, public_key: str) -> Connector:
+        if not public_key:
+            raise ValueError('Empty "public_key"')
+
+        connector = Connector(private_key=private_key,
+                              public_key=public_key,
+                              timeout=self.__timeout,
+                              signing_executor=self.__signing_executor,
+                              require_fast_signer=self.__require_fast_signer,
+                              token_ttl=self.__token_ttl,
+                              token_cache_path=self.__token_cache_path,
+                              rate_limiter=self.__rate_limiter,
+                              instrument=self.__instrument,
+                              fast_json=self.__fast_json,
+                              session=self.__session,
+                              api_url=self.__api_url)
+
+        with self.__lock:
+            previous = self.__connectors.get(public_key.lower())
+            self.__connectors[public_key.lower()] = connector
+
+        if previous is not None:
+            previous.close()
+
+        return connector
+
+    def remove_account(self, public_key: str):
+        with self.__lock:
+            connector = self.__connectors.pop(public_key.lower(), None)
+
+        if connector is None:
+            raise UnknownAccountException(public_key)
+
+        connector.close()
+
+    def connector(self, public_key: str) -> Connector:
+        try:
+            return self.__connectors[public_key.lower()]
+        except KeyError:
+            raise UnknownAccountException(public_key) from None
+
+    def get_balance(self, public_key: str):
+        return self.connector(public_key).get_balance()
+
+    def send_order(self,
+                   public_key: str,
+                   action: OrderBookAction,
+                   ticker_hash: str,
+                   currency_hash: str,
+                   price: Decimal,
+                   quantity: int,
+                   expires_at: int):
+        return self.connector(public_key).send_order(action=action,
+                                                     ticker_hash=ticker_hash,
+                                                     currency_hash=currency_hash,
+                                                     price=price,
+                                                     quantity=quantity,
+                                                     expires_at=expires_at)
+
+    def cancel_order(self, public_key: str, order_ids: List[str]):
+        return self.connector(public_key).cancel_order(order_ids=order_ids)
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        with self.__lock:
+            if self.__executor is None:
+                self.__executor = ThreadPoolExecutor(max_workers=self.__workers)
+            return self.__executor
+
+    def map(self,
+            fn: Callable[[Connector], Any],
+            public_keys: Optional[Iterable[str]] = None) -> List[AccountResult]:
+        """
+        Run fn(connector) for every account concurrently, one failed account does not fail the others
+        """
+        connectors = [(public_key, self.connector(public_key)) for public_key in public_keys] \
+            if public_keys is not None else list(self.__connectors.items())
+
+        def call(connector: Connector):
+            try:
+                return fn(connector), None
+            except Exception as e:
+                return None, e
+
+        executor = self.__get_executor()
+        futures = [(public_key, executor.submit(call, connector)) for public_key, connector in connectors]
+
+        return [AccountResult(public_key, *future.result()) for public_key, future in futures]
+
+    def get_balances(self, public_keys: Optional[Iterable[str]] = None) -> List[AccountResult]:
+        return self.map(lambda connector: connector.get_balance(), public_keys=public_keys)
+
+    def close(self):
+        """
+        Close every account, the worker pool and the shared HTTP connections
+        """
+        with self.__lock:
+            connectors = list(self.__connectors.values())
+            self.__connectors.clear()
+            executor, self.__executor = self.__executor, None
+
+        for connector in connectors:
+            connector.close()
+        if executor is not None:
+            executor.shutdown()
+        if self.__owns_signing_executor:
+            self.__signing_executor.shutdown()
+        self.__session.close()
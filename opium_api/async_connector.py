@@ -0,0 +1,347 @@
+import asyncio
+
+from decimal import Decimal
+from http import HTTPStatus
+from typing import Optional, List, Union, Dict
+
+import aiohttp
+
+from aiohttp import ClientResponse
+
+from libs.py_eth_sig_utils.signing import v_r_s_to_signature, Signer
+
+
+from opium_api.enums import HttpMethod, OrderBookAction, CancelStatus
+from opium_api.constants import API_VERSION, API_HOST, CONNECT_TIMEOUT, READ_TIMEOUT, ACCESS_TOKEN_TTL
+from opium_api.exceptions import APIException, UnknownHttpMethod
+from opium_api.rate_limiter import RateLimiter
+from opium_api.signing_executor import SigningExecutor
+from opium_api.token_manager import TokenManager
+from opium_api.coercion import coerce_order_to_sign
+from opium_api import json_codec
+
+
+class AsyncConnector:
+    def __init__(self,
+                 private_key: str,
+                 public_key: str,
+                 limit: int = 100,
+                 limit_per_host: int = 0,
+                 keepalive_timeout: float = 15,
+                 connect_timeout: float = CONNECT_TIMEOUT,
+                 read_timeout: float = READ_TIMEOUT,
+                 signing_executor: Optional[SigningExecutor] = None,
+                 require_fast_signer: bool = False,
+                 token_ttl: float = ACCESS_TOKEN_TTL,
+                 token_cache_path: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 api_url: Optional[str] = None):
+        if not private_key:
+            raise ValueError('Empty "private_key"')
+        if not public_key:
+            raise ValueError('Empty "public_key"')
+
+        self.__api_url: str = (api_url or f'https://{API_HOST}/{API_VERSION}').rstrip('/')
+        self.__signer: Signer = Signer(bytes.fromhex(private_key), require_fast_backend=require_fast_signer)
+        self.__public_key: str = public_key
+        # Without a generate callback, tokens come from __get_access_token through update()
+        self.__token_manager: TokenManager = TokenManager(ttl=token_ttl,
+                                                          cache_path=token_cache_path,
+                                                          cache_key=f'{self.__api_url}|{public_key.lower()}')
+        self.__signing_executor: SigningExecutor = signing_executor or SigningExecutor()
+
+        self.__limit: int = limit
+        # Every call goes to the same host, so 0 (no per host cap) leaves ``limit`` in charge
+        self.__limit_per_host: int = limit_per_host
+        self.__keepalive_timeout: float = keepalive_timeout
+        self.__timeout: aiohttp.ClientTimeout = aiohttp.ClientTimeout(sock_connect=connect_timeout,
+                                                                      sock_read=read_timeout)
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__token_lock: Optional[asyncio.Lock] = None
+        self.__rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def __get_session(self) -> aiohttp.ClientSession:
+        # The session is bound to the running event loop, so it is created on first use
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit=self.__limit,
+                                             limit_per_host=self.__limit_per_host,
+                                             keepalive_timeout=self.__keepalive_timeout)
+            self.__session = aiohttp.ClientSession(connector=connector,
+                                                   timeout=self.__timeout,
+                                                   json_serialize=lambda obj: json_codec.dumps(obj).decode('utf-8'))
+        return self.__session
+
+    async def close(self):
+        """
+        Release pooled HTTP connections
+        """
+        if self.__session is not None and not self.__session.closed:
+            await self.__session.close()
+        self.__session = None
+        self.__token_manager.close()
+
+    def __signe_message(self, msg: dict) -> str:
+        return v_r_s_to_signature(*self.__signer.sign_typed_data(msg)).hex()
+
+    def __sign_orders(self, orders: List[dict]) -> List[str]:
+        # Convert str representation for uint256 to Python bigint
+        messages = [coerce_order_to_sign(order['orderToSign']) for order in orders]
+        return self.__signing_executor.sign(self.__signer, messages)
+
+    async def __run_in_executor(self, fn, *args):
+        # Signing is CPU bound, keep it off the event loop
+        return await asyncio.get_event_loop().run_in_executor(None, fn, *args)
+
+    async def __get_access_token(self) -> str:
+        access_token = self.__token_manager.current()
+        if access_token:
+            return access_token
+
+        if self.__token_lock is None:
+            self.__token_lock = asyncio.Lock()
+
+        async with self.__token_lock:
+            # Another task may have generated the token while we were waiting
+            access_token = self.__token_manager.current()
+            if not access_token:
+                access_token = self.__token_manager.update(
+                    await self.__run_in_executor(self.__signe_message, await self.__api_auth_logindata()))
+
+        return access_token
+
+    async def __make_public_call(self,
+                                 endpoint: str,
+                                 method: HttpMethod,
+                                 headers: Optional[dict] = None,
+                                 arguments: Optional[dict] = None,
+                                 data: Union[Optional[dict], Optional[list]] = None) -> ClientResponse:
+        headers = headers or dict()
+        arguments = arguments or dict()
+        data = data or dict()
+
+        api_url = f'{self.__api_url}{endpoint}'
+
+        for attempt in range(self.__rate_limiter.max_retries + 1):
+            await self.__rate_limiter.acquire_async(endpoint)
+
+            if method == HttpMethod.get:
+                request = self.__get_session().get(url=api_url, headers=headers, params=arguments)
+
+            elif method == HttpMethod.post:
+                request = self.__get_session().post(url=api_url, headers=headers, params=arguments, json=data)
+
+            elif method == HttpMethod.put:
+                request = self.__get_session().put(url=api_url, headers=headers, params=arguments, json=data)
+
+            else:
+                raise UnknownHttpMethod
+
+            async with request as ret:
+                # Read the body before the connection goes back to the pool
+                await ret.read()
+
+            if ret.status != HTTPStatus.TOO_MANY_REQUESTS:
+                break
+
+            if attempt == self.__rate_limiter.max_retries:
+                self.__rate_limiter.rejected()
+                break
+
+            await asyncio.sleep(self.__rate_limiter.backoff(attempt, ret.headers.get('Retry-After')))
+
+        return ret
+
+    async def __make_secure_call(self,
+                                 endpoint: str,
+                                 method: HttpMethod,
+                                 arguments: Optional[dict] = None,
+                                 data: Union[Optional[dict], Optional[list]] = None) -> ClientResponse:
+        access_token = await self.__get_access_token()
+
+        headers = {
+            'Authorization': f'Bearer 0x{access_token}'
+        }
+
+        ret = await self.__make_public_call(endpoint=endpoint,
+                                            method=method,
+                                            headers=headers,
+                                            arguments=arguments,
+                                            data=data)
+
+        if ret.status == HTTPStatus.UNAUTHORIZED:
+            # The token expired or was revoked, retry once with a new one
+            self.__token_manager.invalidate(access_token)
+
+            headers = {
+                'Authorization': f'Bearer 0x{await self.__get_access_token()}'
+            }
+
+            ret = await self.__make_public_call(endpoint=endpoint,
+                                                method=method,
+                                                headers=headers,
+                                                arguments=arguments,
+                                                data=data)
+
+        return ret
+
+    async def __api_auth_logindata(self) -> dict:
+        """
+        GET /auth/loginData
+        """
+        ret = await self.__make_public_call(endpoint='/auth/loginData', method=HttpMethod.get)
+
+        if ret.status != HTTPStatus.OK:
+            raise APIException('Unable to get login data')
+
+        return await ret.json(loads=json_codec.loads)
+
+    async def __api_wallet_balance_tokens(self) -> dict:
+        """
+        GET /wallet/balance/tokens
+        """
+        arguments = {
+            'authAddress': self.__public_key
+        }
+
+        ret = await self.__make_secure_call(endpoint='/wallet/balance/tokens',
+                                            method=HttpMethod.get,
+                                            arguments=arguments)
+
+        if ret.status == HTTPStatus.NO_CONTENT:
+            raise APIException('Wallet NO CONTENT -- Not implemented')
+
+        elif ret.status != HTTPStatus.OK:
+            raise APIException('Unknown API error')
+
+        return await ret.json(loads=json_codec.loads)
+
+    async def __api_orderbook_formorder(self,
+                                        action: OrderBookAction,
+                                        ticker_hash: str,
+                                        currency_hash: str,
+                                        price: Decimal,
+                                        quantity: int,
+                                        expires_at: int) -> List[dict]:
+        """
+        POST /orderbook/formOrder
+        """
+        arguments = {
+            'authAddress': self.__public_key
+        }
+
+        data = {
+            'action': action.value,
+            'price': float(price),
+            'ticker': ticker_hash,
+            'quantity': quantity,
+            'expiresAt': expires_at,
+            'currency': currency_hash
+        }
+
+        ret = await self.__make_secure_call(endpoint='/orderbook/formOrder',
+                                            method=HttpMethod.post,
+                                            arguments=arguments,
+                                            data=data)
+
+        if ret.status not in (HTTPStatus.OK, HTTPStatus.CREATED):
+            raise APIException(f'Unable to form order: {ret.status}')
+
+        return await ret.json(loads=json_codec.loads)
+
+    async def __api_orderbook_orders(self, signed_orders: List[dict]) -> ClientResponse:
+        """
+        POST /orderbook/orders
+        """
+        arguments = {
+            'authAddress': self.__public_key
+        }
+
+        return await self.__make_secure_call(endpoint='/orderbook/orders',
+                                             method=HttpMethod.post,
+                                             arguments=arguments,
+                                             data=signed_orders)
+
+    async def __api_orderbook_cancel(self, order_ids: List[str]) -> int:
+        """
+        PUT /orderbook/cancel
+        """
+        # aiohttp does not expand list values, so repeat the key for every id
+        arguments = [('authAddress', self.__public_key)] + [('ids[]', order_id) for order_id in order_ids]
+
+        ret = await self.__make_secure_call(endpoint='/orderbook/cancel',
+                                            method=HttpMethod.put,
+                                            arguments=arguments)
+
+        if ret.status not in (HTTPStatus.ACCEPTED, HTTPStatus.NOT_FOUND):
+            raise APIException(f'Unable to cancel orders: {ret.status}')
+
+        return ret.status
+
+    async def __prepare_order(self,
+                              action: OrderBookAction,
+                              ticker_hash: str,
+                              currency_hash: str,
+                              price: Decimal,
+                              quantity: int,
+                              expires_at: int) -> List[dict]:
+        orders_for_sign: List[dict] = await self.__api_orderbook_formorder(action=action,
+                                                                           ticker_hash=ticker_hash,
+                                                                           currency_hash=currency_hash,
+                                                                           price=price,
+                                                                           quantity=quantity,
+                                                                           expires_at=expires_at)
+        if not orders_for_sign:
+            raise ValueError
+
+        return orders_for_sign
+
+    async def __create_orders(self, orders: List[dict]) -> List[dict]:
+        signatures = await self.__run_in_executor(self.__sign_orders, orders)
+        data = [{'id': order['id'], 'signature': f'0x{signature}'} for order, signature in zip(orders, signatures)]
+
+        ret = await self.__api_orderbook_orders(signed_orders=data)
+
+        return await ret.json(loads=json_codec.loads)
+
+    async def get_balance(self):
+        return await self.__api_wallet_balance_tokens()
+
+    async def send_order(self,
+                         action: OrderBookAction,
+                         ticker_hash: str,
+                         currency_hash: str,
+                         price: Decimal,
+                         quantity: int,
+                         expires_at: int):
+        order = await self.__prepare_order(action=action,
+                                           ticker_hash=ticker_hash,
+                                           currency_hash=currency_hash,
+                                           price=price,
+                                           quantity=quantity,
+                                           expires_at=expires_at)
+        return await self.__create_orders(order)
+
+    async def cancel_order(self, order_ids: List[str]) -> Dict[str, CancelStatus]:
+        """
+        Cancel orders, returning the CancelStatus of every id
+
+        A 404 does not say which ids were missing, so the ids of a rejected
+        call are retried one by one.
+        """
+        if not order_ids:
+            return {}
+
+        status = await self.__api_orderbook_cancel(order_ids=order_ids)
+        if status == HTTPStatus.ACCEPTED:
+            return {order_id: CancelStatus.canceled for order_id in order_ids}
+        elif len(order_ids) == 1:
+            return {order_ids[0]: CancelStatus.not_found}
+
+        statuses = await asyncio.gather(*[self.cancel_order([order_id]) for order_id in dict.fromkeys(order_ids)])
+        return {order_id: status for result in statuses for order_id, status in result.items()}
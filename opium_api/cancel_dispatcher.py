@@ -0,0 +1,150 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from http import HTTPStatus
+from threading import Condition, Thread
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from opium_api.enums import CancelStatus
+from opium_api.constants import CANCEL_WINDOW, CANCEL_MAX_URL_LENGTH, CANCEL_WORKERS
+
+
+class CancelDispatcher:
+    """
+    Merges cancel requests arriving within ``window`` seconds into as few
+    PUT /orderbook/cancel calls as the query string budget allows
+
+    ``send`` takes a list of order ids and returns the HTTP status code. Every
+    caller gets a future resolving to the CancelStatus of each of its ids. A
+    404 for a chunk is narrowed down by cancelling its ids one by one.
+    """
+
+    def __init__(self,
+                 send: Callable[[List[str]], int],
+                 window: float = CANCEL_WINDOW,
+                 max_query_length: int = CANCEL_MAX_URL_LENGTH,
+                 workers: int = CANCEL_WORKERS):
+        self.__send: Callable[[List[str]], int] = send
+        self.__window: float = window
+        self.__max_query_length: int = max_query_length
+        self.__executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers)
+
+        self.__pending: List[Tuple[List[str], Future]] = []
+        # Query string length of the pending ids, duplicates included
+        self.__pending_length: int = 0
+        self.__condition: Condition = Condition()
+        self.__thread: Optional[Thread] = None
+        self.__closed: bool = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, order_ids: List[str]) -> Future:
+        future = Future()
+        if not order_ids:
+            future.set_result({})
+            return future
+
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError('CancelDispatcher is closed')
+
+            self.__pending.append((list(order_ids), future))
+            self.__pending_length += sum(self.__id_length(order_id) for order_id in order_ids)
+            if self.__thread is None:
+                self.__thread = Thread(target=self.__run, name='cancel-dispatcher', daemon=True)
+                self.__thread.start()
+            self.__condition.notify()
+
+        return future
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while not self.__pending and not self.__closed:
+                    self.__condition.wait()
+                if not self.__pending:
+                    return
+
+                # Give concurrent callers until the deadline to join this batch,
+                # every submit() wakes us up so keep waiting for what is left
+                deadline = monotonic() + self.__window
+                while not self.__closed and self.__pending_length < self.__max_query_length:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+
+                pending, self.__pending = self.__pending, []
+                self.__pending_length = 0
+
+            self.__dispatch(pending)
+
+    @staticmethod
+    def __id_length(order_id: str) -> int:
+        # "&ids%5B%5D=<id>" as requests encodes it
+        return len('&ids%5B%5D=') + len(quote(order_id, safe=''))
+
+    def __chunks(self, order_ids: List[str]) -> List[List[str]]:
+        chunks: List[List[str]] = []
+        length = self.__max_query_length
+        for order_id in order_ids:
+            id_length = self.__id_length(order_id)
+            if not chunks or length + id_length > self.__max_query_length:
+                chunks.append([])
+                length = 0
+            chunks[-1].append(order_id)
+            length += id_length
+        return chunks
+
+    def __cancel(self, order_ids: List[str]) -> Dict[str, CancelStatus]:
+        try:
+            status = self.__send(order_ids)
+        except Exception:
+            return {order_id: CancelStatus.failed for order_id in order_ids}
+
+        if status == HTTPStatus.ACCEPTED:
+            return {order_id: CancelStatus.canceled for order_id in order_ids}
+        elif status == HTTPStatus.NOT_FOUND:
+            return {order_id: CancelStatus.not_found for order_id in order_ids}
+
+        return {order_id: CancelStatus.failed for order_id in order_ids}
+
+    def __cancel_many(self, chunks: List[List[str]]) -> Dict[str, CancelStatus]:
+        statuses: Dict[str, CancelStatus] = {}
+        for result in self.__executor.map(self.__cancel, chunks):
+            statuses.update(result)
+        return statuses
+
+    def __dispatch(self, pending: List[Tuple[List[str], Future]]):
+        order_ids = list(dict.fromkeys(order_id for ids, _ in pending for order_id in ids))
+
+        try:
+            chunks = self.__chunks(order_ids)
+            statuses = self.__cancel_many(chunks)
+
+            # A 404 does not say which ids of the chunk were missing, so retry them one by one
+            ambiguous = [[order_id] for chunk in chunks if len(chunk) > 1 for order_id in chunk
+                         if statuses[order_id] == CancelStatus.not_found]
+            if ambiguous:
+                statuses.update(self.__cancel_many(ambiguous))
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+
+        for ids, future in pending:
+            future.set_result({order_id: statuses[order_id] for order_id in ids})
+
+    def close(self):
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+            thread = self.__thread
+
+        if thread is not None:
+            thread.join()
+        self.__executor.shutdown()
@@ -0,0 +1,107 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from libs.py_eth_sig_utils.cache import lru_cache
+from libs.py_eth_sig_utils.eip712.encoding import types_fingerprint, types_from_fingerprint
+
+from opium_api.constants import COERCION_PLAN_CACHE_SIZE
+
+Steps = Tuple[Tuple[str, Callable], ...]
+
+DOMAIN_TYPE = 'EIP712Domain'
+
+
+class CoercionPlan:
+    """
+    uint256 paths of one EIP-712 schema, compiled once
+
+    The API sends uint256 values as strings. The plan lists, per struct type, the
+    fields that need int() including nested structs and arrays, so applying it is
+    a loop over known fields instead of a walk over every type definition.
+    """
+
+    def __init__(self, primary_type: str, types: Dict[str, List[dict]]):
+        self.__steps: Dict[str, Steps] = {}
+        self.__compiling: set = set()
+
+        self.primary_type: str = primary_type
+        self.__message_steps: Steps = self.__compile(primary_type, types)
+        self.__domain_steps: Steps = self.__compile(DOMAIN_TYPE, types) if DOMAIN_TYPE in types else ()
+
+    def __compile(self, type_name: str, types: Dict[str, List[dict]]) -> Steps:
+        if type_name in self.__steps:
+            return self.__steps[type_name]
+
+        self.__compiling.add(type_name)
+        steps = []
+        for field in types[type_name]:
+            converter = self.__converter(field['type'], types)
+            if converter is not None:
+                steps.append((field['name'], converter))
+        self.__compiling.discard(type_name)
+
+        self.__steps[type_name] = tuple(steps)
+        return self.__steps[type_name]
+
+    def __converter(self, field_type: str, types: Dict[str, List[dict]]) -> Optional[Callable]:
+        if field_type.endswith(']'):
+            item = self.__converter(field_type[:field_type.rindex('[')], types)
+            if item is None:
+                return None
+            return lambda values: [item(value) for value in values]
+
+        if field_type == 'uint256':
+            return int
+
+        if field_type in types:
+            if field_type in self.__compiling:
+                # Recursive struct, its steps are looked up when the plan is applied
+                return lambda value: self.__apply(self.__steps[field_type], value)
+            steps = self.__compile(field_type, types)
+            if not steps:
+                return None
+            return lambda value: self.__apply(steps, value)
+
+        return None
+
+    @staticmethod
+    def __apply(steps: Steps, value: dict) -> dict:
+        value = dict(value)
+        for name, converter in steps:
+            if name in value:
+                value[name] = converter(value[name])
+        return value
+
+    def apply(self, order_to_sign: dict) -> dict:
+        """
+        Coerced copy of an orderToSign payload, the payload itself is left untouched
+        """
+        result = dict(order_to_sign)
+        result['message'] = self.__apply(self.__message_steps, order_to_sign['message'])
+        if self.__domain_steps and order_to_sign.get('domain'):
+            result['domain'] = self.__apply(self.__domain_steps, order_to_sign['domain'])
+        return result
+
+
+@lru_cache(maxsize=COERCION_PLAN_CACHE_SIZE)
+def _coercion_plan_cached(primary_type: str, fingerprint: tuple) -> CoercionPlan:
+    return CoercionPlan(primary_type, types_from_fingerprint(fingerprint))
+
+
+# Last plan per primary type. Orders from one formOrder response share their schema,
+# and comparing dicts is much cheaper than fingerprinting them for every order.
+_recent_plans: Dict[str, Tuple[Dict[str, List[dict]], CoercionPlan]] = {}
+
+
+def coercion_plan(primary_type: str, types: Dict[str, List[dict]]) -> CoercionPlan:
+    recent = _recent_plans.get(primary_type)
+    if recent is not None and recent[0] == types:
+        return recent[1]
+
+    fingerprint = types_fingerprint(types)
+    plan = _coercion_plan_cached(primary_type, fingerprint)
+    _recent_plans[primary_type] = (types_from_fingerprint(fingerprint), plan)
+    return plan
+
+
+def coerce_order_to_sign(order_to_sign: dict) -> dict:
+    return coercion_plan(order_to_sign['primaryType'], order_to_sign['types']).apply(order_to_sign)
@@ -1,80 +1,223 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor, Future
 from decimal import Decimal, getcontext
 from http import HTTPStatus
-from typing import Optional, List, Union
+from threading import Lock
+from typing import Optional, List, Union, Tuple, Dict
 
 import requests
 
 from requests import Response
-
-from libs.py_eth_sig_utils.signing import v_r_s_to_signature, sign_typed_data
-
-
-from opium_api.enums import HttpMethod, OrderBookAction
-from opium_api.constants import API_VERSION, API_HOST
-from opium_api.exceptions import APIException, UnknownHttpMethod
+from requests.adapters import HTTPAdapter
+
+from libs.py_eth_sig_utils.signing import v_r_s_to_signature, Signer
+from libs.py_eth_sig_utils.instrumentation import Instrument
+
+
+from opium_api.enums import HttpMethod, OrderBookAction, CancelStatus
+from opium_api.constants import API_VERSION, API_HOST, POOL_CONNECTIONS, POOL_MAXSIZE, CONNECT_TIMEOUT, READ_TIMEOUT, \
+    ORDERS_BATCH_SIZE, ORDERS_REJECTED_STATUSES, FORM_ORDER_WORKERS, ACCESS_TOKEN_TTL, CANCEL_WINDOW, \
+    CANCEL_MAX_URL_LENGTH
+from opium_api.signing_executor import SigningExecutor
+from opium_api.token_manager import TokenManager
+from opium_api.rate_limiter import RateLimiter
+from opium_api.exceptions import APIException, UnknownHttpMethod, PreparedOrderMissingException
+from opium_api.models import OrderSpec, OrderResult
+from opium_api.order_tracker import OrderTracker
+from opium_api.cancel_dispatcher import CancelDispatcher
+from opium_api.prepared_orders import PreparedOrderCache
+from opium_api.coercion import coerce_order_to_sign
+from opium_api import json_codec
+
+
+def create_session(pool_connections: int = POOL_CONNECTIONS,
+                   pool_maxsize: int = POOL_MAXSIZE,
+                   keep_alive: bool = True) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
 
 
 class Connector:
-    def __init__(self, private_key: str, public_key: str):
+    def __init__(self,
+                 private_key: str,
+                 public_key: str,
+                 pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE,
+                 keep_alive: bool = True,
+                 timeout: Union[float, Tuple[float, float]] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 signing_executor: Optional[SigningExecutor] = None,
+                 require_fast_signer: bool = False,
+                 token_ttl: float = ACCESS_TOKEN_TTL,
+                 token_cache_path: Optional[str] = None,
+                 token_background_refresh: bool = False,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 order_tracker: Optional[OrderTracker] = None,
+                 cancel_window: float = CANCEL_WINDOW,
+                 instrument: Optional[Instrument] = None,
+                 fast_json: bool = False,
+                 session: Optional[requests.Session] = None,
+                 api_url: Optional[str] = None):
         if not private_key:
             raise ValueError('Empty "private_key"')
         if not public_key:
             raise ValueError('Empty "public_key"')
 
-        self.__api_url: str = f'https://{API_HOST}/{API_VERSION}'
-        self.__access_token: str = ''
-        self.__private_key: bytes = bytes.fromhex(private_key)
+        self.__api_url: str = (api_url or f'https://{API_HOST}/{API_VERSION}').rstrip('/')
+        # The signer reports its eip712 and ecdsa spans to the same instrument
+        self.__signer: Signer = Signer(bytes.fromhex(private_key),
+                                       require_fast_backend=require_fast_signer,
+                                       instrument=instrument)
         self.__public_key: str = public_key
+        self.__token_manager: TokenManager = TokenManager(generate=self.__generate_access_token,
+                                                          ttl=token_ttl,
+                                                          cache_path=token_cache_path,
+                                                          cache_key=f'{self.__api_url}|{public_key.lower()}',
+                                                          background_refresh=token_background_refresh)
+        self.__timeout: Union[float, Tuple[float, float]] = timeout
+        self.__signing_executor: SigningExecutor = signing_executor or SigningExecutor()
+        self.__rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.__order_tracker: Optional[OrderTracker] = order_tracker
+        self.__cancel_window: float = cancel_window
+        self.__prepared_orders: PreparedOrderCache = PreparedOrderCache()
+        self.__instrument: Optional[Instrument] = instrument
+        # orjson for responses too, only safe while they carry no bare integers wider than 64 bits
+        self.__fast_json: bool = fast_json
+        self.__cancel_dispatcher: Optional[CancelDispatcher] = None
+        self.__cancel_dispatcher_lock: Lock = Lock()
+        # A session passed in is shared with other connectors and closed by its owner
+        self.__owns_session: bool = session is None
+        self.__session: requests.Session = session or create_session(pool_connections=pool_connections,
+                                                                     pool_maxsize=pool_maxsize,
+                                                                     keep_alive=keep_alive)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """
+        Release pooled HTTP connections and stop the token refresh
+        """
+        if self.__cancel_dispatcher is not None:
+            self.__cancel_dispatcher.close()
+        self.__token_manager.close()
+        if self.__owns_session:
+            self.__session.close()
 
     def __signe_message(self, msg: dict) -> str:
-        return v_r_s_to_signature(*sign_typed_data(msg, self.__private_key)).hex()
+        return v_r_s_to_signature(*self.__signer.sign_typed_data(msg)).hex()
 
-    def __generate_access_token(self):
-        self.__access_token = self.__signe_message(self.__api_auth_logindata())
+    def __generate_access_token(self) -> str:
+        return self.__signe_message(self.__api_auth_logindata())
 
     def __make_public_call(self,
                            endpoint: str,
                            method: HttpMethod,
                            headers: Optional[dict] = None,
                            arguments: Optional[dict] = None,
-                           data: Union[Optional[dict], Optional[list]] = None) -> Response:
+                           data: Union[Optional[dict], Optional[list]] = None,
+                           body: Optional[bytes] = None) -> Response:
         headers = headers or dict()
         arguments = arguments or dict()
         data = data or dict()
 
         api_url = f'{self.__api_url}{endpoint}'
 
-        if method == HttpMethod.get:
-            ret = requests.get(url=api_url, headers=headers, params=arguments)
+        if method in (HttpMethod.post, HttpMethod.put):
+            headers = {**headers, 'Content-Type': 'application/json'}
+            if body is None:
+                body = json_codec.dumps(data)
+
+        for attempt in range(self.__rate_limiter.max_retries + 1):
+            self.__rate_limiter.acquire(endpoint)
+
+            start = time.perf_counter() if self.__instrument is not None else 0
 
-        elif method == HttpMethod.post:
-            ret = requests.post(url=api_url, headers=headers, params=arguments, json=data)
+            if method == HttpMethod.get:
+                ret = self.__session.get(url=api_url, headers=headers, params=arguments, timeout=self.__timeout)
 
-        elif method == HttpMethod.put:
-            ret = requests.put(url=api_url, headers=headers, params=arguments, json=data)
+            elif method == HttpMethod.post:
+                ret = self.__session.post(url=api_url, headers=headers, params=arguments, data=body, timeout=self.__timeout)
 
-        else:
-            raise UnknownHttpMethod
+            elif method == HttpMethod.put:
+                ret = self.__session.put(url=api_url, headers=headers, params=arguments, data=body, timeout=self.__timeout)
+
+            else:
+                raise UnknownHttpMethod
+
+            if self.__instrument is not None:
+                self.__instrument.on_span('request', time.perf_counter() - start, {
+                    'endpoint': endpoint,
+                    'method': method.name,
+                    'status': ret.status_code,
+                    'bytes': len(ret.content),
+                    'attempt': attempt
+                })
+
+            if ret.status_code != HTTPStatus.TOO_MANY_REQUESTS:
+                break
+
+            if attempt == self.__rate_limiter.max_retries:
+                self.__rate_limiter.rejected()
+                break
+
+            time.sleep(self.__rate_limiter.backoff(attempt, ret.headers.get('Retry-After')))
 
         return ret
 
+    def __parse(self, ret: Response):
+        return json_codec.loads(ret.content, fast=self.__fast_json)
+
+    def __response_error(self, ret: Response, description: str) -> APIException:
+        try:
+            message = self.__parse(ret).get('message')
+        except Exception:
+            message = None
+        return APIException(f'{description}: {ret.status_code}' + (f' {message}' if message else ''))
+
     def __make_secure_call(self,
                            endpoint: str,
                            method: HttpMethod,
                            arguments: Optional[dict] = None,
-                           data: Union[Optional[dict], Optional[list]] = None) -> Response:
-        if not self.__access_token:
-            self.__generate_access_token()
+                           data: Union[Optional[dict], Optional[list]] = None,
+                           body: Optional[bytes] = None) -> Response:
+        access_token = self.__token_manager.get()
 
         headers = {
-            'Authorization': f'Bearer 0x{self.__access_token}'
+            'Authorization': f'Bearer 0x{access_token}'
         }
 
-        return self.__make_public_call(endpoint=endpoint,
-                                       method=method,
-                                       headers=headers,
-                                       arguments=arguments,
-                                       data=data)
+        ret = self.__make_public_call(endpoint=endpoint,
+                                      method=method,
+                                      headers=headers,
+                                      arguments=arguments,
+                                      data=data,
+                                      body=body)
+
+        if ret.status_code == HTTPStatus.UNAUTHORIZED:
+            # The token expired or was revoked, retry once with a new one
+            self.__token_manager.invalidate(access_token)
+
+            headers = {
+                'Authorization': f'Bearer 0x{self.__token_manager.get()}'
+            }
+
+            ret = self.__make_public_call(endpoint=endpoint,
+                                          method=method,
+                                          headers=headers,
+                                          arguments=arguments,
+                                          data=data,
+                                          body=body)
+
+        return ret
 
     def __api_auth_logindata(self) -> dict:
         """
@@ -85,7 +228,7 @@ class Connector:
         if ret.status_code != HTTPStatus.OK:
             raise APIException('Unable to get login data')
 
-        return ret.json()
+        return self.__parse(ret)
 
     def __api_wallet_balance_tokens(self) -> dict:
         """
@@ -106,7 +249,7 @@ class Connector:
         elif ret.status_code != HTTPStatus.OK:
             raise APIException('Unknown API error')
 
-        return ret.json()
+        return self.__parse(ret)
 
     def __api_orderbook_formorder(self,
                                   action: OrderBookAction,
@@ -137,14 +280,12 @@ class Connector:
                                       method=HttpMethod.post,
                                       arguments=arguments,
                                       data=data)
-        # TODO:
-        #   Status: 401 - Unauthorized
-        #   Status: 403 - Forbidden
-        #   Status: 422 - Unprocessable entity
-        #   Status: 429 - Too many requests
-        return ret.json()
+        if ret.status_code not in (HTTPStatus.OK, HTTPStatus.CREATED):
+            raise self.__response_error(ret, 'Unable to form order')
 
-    def __api_orderbook_orders(self, signed_orders: List[dict]):
+        return self.__parse(ret)
+
+    def __api_orderbook_orders(self, signed_orders: List[dict], body: Optional[bytes] = None):
         """
         POST /orderbook/orders
         """
@@ -155,7 +296,8 @@ class Connector:
         ret = self.__make_secure_call(endpoint='/orderbook/orders',
                                       method=HttpMethod.post,
                                       arguments=arguments,
-                                      data=signed_orders)
+                                      data=signed_orders,
+                                      body=body)
         # TODO:
         #   Status: 201 - Created
         #   Status: 401 - Unauthorized
@@ -164,10 +306,9 @@ class Connector:
         #   Status: 409 - Conflict
         #   Status: 412 - Precondition Failed
         #   Status: 422 - Unprocessable entity
-        #   Status: 429 - Too many requests
         return ret
 
-    def __api_orderbook_cancel(self, order_ids: List[str]):
+    def __api_orderbook_cancel_request(self, order_ids: List[str]) -> Response:
         """
         PUT /orderbook/cancel
         """
@@ -176,9 +317,12 @@ class Connector:
             'ids[]': order_ids
         }
 
-        ret = self.__make_secure_call(endpoint='/orderbook/cancel',
-                                      method=HttpMethod.put,
-                                      arguments=arguments)
+        return self.__make_secure_call(endpoint='/orderbook/cancel',
+                                       method=HttpMethod.put,
+                                       arguments=arguments)
+
+    def __api_orderbook_cancel(self, order_ids: List[str]) -> int:
+        ret = self.__api_orderbook_cancel_request(order_ids=order_ids)
 
         if ret.status_code == HTTPStatus.UNAUTHORIZED:
             # TODO: Status: 401 - Unauthorized
@@ -195,7 +339,7 @@ class Connector:
         elif ret.status_code != HTTPStatus.ACCEPTED:
             raise NotImplemented(f'__api_orderbook_cancel {ret.status_code}')
 
-        return
+        return ret.status_code
 
     def __prepare_order(self,
                         action: OrderBookAction,
@@ -216,28 +360,38 @@ class Connector:
 
         return orders_for_sign
 
-    def __create_orders(self, orders: List[dict]) -> List[dict]:
-        data = []
+    def __sign_orders(self, orders: List[dict]) -> List[dict]:
+        start = time.perf_counter() if self.__instrument is not None else 0
 
         # Convert str representation for uint256 to Python bigint
-        for order in orders:
-            for _t in order['orderToSign']['types'].values():
-                for v in _t:
-                    if v['type'] == 'uint256' and v['name'] in order['orderToSign']['message']:
-                        order['orderToSign']['message'][v['name']] = int(order['orderToSign']['message'][v['name']])
-
-            data.append({
-                'id': order['id'],
-                'signature': f'0x{self.__signe_message(order["orderToSign"])}'
+        messages = [coerce_order_to_sign(order['orderToSign']) for order in orders]
+
+        coerced = time.perf_counter() if self.__instrument is not None else 0
+
+        signatures = self.__signing_executor.sign(self.__signer, messages)
+
+        if self.__instrument is not None:
+            self.__instrument.on_span('coerce', coerced - start, {'orders': len(orders)})
+            self.__instrument.on_span('sign', time.perf_counter() - coerced, {
+                'orders': len(orders),
+                'backend': self.__signer.backend,
+                'mode': self.__signing_executor.mode.value
             })
 
-        ret = self.__api_orderbook_orders(signed_orders=data)
+        return [{'id': order['id'], 'signature': f'0x{signature}'} for order, signature in zip(orders, signatures)]
+
+    def __create_orders(self, orders: List[dict]) -> List[dict]:
+        ret = self.__api_orderbook_orders(signed_orders=self.__sign_orders(orders))
 
-        return ret.json()
+        return self.__parse(ret)
 
     def login(self):
         raise NotImplemented
 
+    @property
+    def order_tracker(self) -> Optional[OrderTracker]:
+        return self.__order_tracker
+
     def get_balance(self):
         # TODO: Think about return
         return self.__api_wallet_balance_tokens()
@@ -257,8 +411,262 @@ class Connector:
                                      expires_at=expires_at)
         # TODO: Think about return
         # [{'id': '5f2bb28fc90c490033f39a6f'}]
-        return self.__create_orders(order)
+        ret = self.__create_orders(order)
+
+        if self.__order_tracker is not None and isinstance(ret, list):
+            self.__order_tracker.add_many(order_ids=[o['id'] for o in ret if isinstance(o, dict) and 'id' in o],
+                                          spec=OrderSpec(action=action,
+                                                         ticker_hash=ticker_hash,
+                                                         currency_hash=currency_hash,
+                                                         price=price,
+                                                         quantity=quantity,
+                                                         expires_at=expires_at))
+        return ret
+
+    def __prepare_signed_orders(self,
+                                specs: List[OrderSpec],
+                                max_workers: int) -> Tuple[List[Optional[OrderResult]], List[Tuple[int, List[dict]]]]:
+        """
+        Fetch formOrder payloads for ``specs`` concurrently and sign them
+
+        Returns the results of specs that failed and (spec index, signed orders) for the rest
+        """
+        # Make sure the worker threads share one access token
+        self.__token_manager.get()
+
+        def prepare(spec: OrderSpec) -> List[dict]:
+            return self.__prepare_order(action=spec.action,
+                                        ticker_hash=spec.ticker_hash,
+                                        currency_hash=spec.currency_hash,
+                                        price=spec.price,
+                                        quantity=spec.quantity,
+                                        expires_at=spec.expires_at)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(prepare, spec) for spec in specs]
+
+        results: List[Optional[OrderResult]] = [None] * len(specs)
+        prepared: List[Tuple[int, List[dict]]] = []
+
+        for index, (spec, future) in enumerate(zip(specs, futures)):
+            try:
+                prepared.append((index, future.result()))
+            except Exception as e:
+                results[index] = OrderResult(spec=spec, order_ids=[], error=e)
+
+        # Sign everything in one go so the signing executor can spread it over its workers
+        try:
+            signed = self.__sign_orders([order for _, orders in prepared for order in orders])
+        except Exception:
+            signed = None
+
+        pending: List[Tuple[int, List[dict]]] = []
+        offset = 0
+        for index, orders in prepared:
+            if signed is not None:
+                pending.append((index, signed[offset:offset + len(orders)]))
+                offset += len(orders)
+                continue
+
+            # Find out which specs can not be signed
+            try:
+                pending.append((index, self.__sign_orders(orders)))
+            except Exception as e:
+                results[index] = OrderResult(spec=specs[index], order_ids=[], error=e)
+
+        return results, pending
+
+    def __submit_signed_orders(self,
+                               specs: List[OrderSpec],
+                               results: List[Optional[OrderResult]],
+                               pending: List[Tuple[int, List[dict]]],
+                               batch_size: int,
+                               bodies: Optional[Dict[int, bytes]] = None) -> List[OrderResult]:
+        # Group whole specs into POSTs of at most batch_size signed orders
+        batches: List[List[Tuple[int, List[dict]]]] = []
+        batch_length = 0
+        for item in pending:
+            if not batches or batch_length + len(item[1]) > batch_size:
+                batches.append([])
+                batch_length = 0
+            batches[-1].append(item)
+            batch_length += len(item[1])
+
+        for batch in batches:
+            self.__submit_batch(specs=specs, results=results, batch=batch, bodies=bodies)
+
+        return results
+
+    def __submit_batch(self,
+                       specs: List[OrderSpec],
+                       results: List[Optional[OrderResult]],
+                       batch: List[Tuple[int, List[dict]]],
+                       bodies: Optional[Dict[int, bytes]] = None):
+        """
+        POST one batch and set the result of each of its specs
+
+        A batch rejected for its orders (ORDERS_REJECTED_STATUSES) is split in
+        halves and resubmitted until every rejected spec has its own error.
+        """
+        created: Optional[set] = None
+        error = None
+        try:
+            # Reuse orders serialized when they were prepared
+            body = None
+            if bodies and all(index in bodies for index, _ in batch):
+                body = json_codec.join_items([bodies[index] for index, _ in batch])
+
+            ret = self.__api_orderbook_orders(signed_orders=[order for _, signed in batch for order in signed],
+                                              body=body)
+            if ret.status_code in (HTTPStatus.OK, HTTPStatus.CREATED):
+                try:
+                    # [{'id': '5f2bb28fc90c490033f39a6f'}, ...]
+                    created = {order['id'] for order in self.__parse(ret)}
+                except Exception:
+                    # Nothing to map back, the status says every order was created
+                    created = None
+            elif ret.status_code in ORDERS_REJECTED_STATUSES and len(batch) > 1:
+                middle = len(batch) // 2
+                self.__submit_batch(specs=specs, results=results, batch=batch[:middle], bodies=bodies)
+                self.__submit_batch(specs=specs, results=results, batch=batch[middle:], bodies=bodies)
+                return
+            else:
+                error = self.__response_error(ret, 'Unable to create orders')
+        except Exception as e:
+            error = e
+
+        for index, signed in batch:
+            order_ids = [] if error else [order['id'] for order in signed
+                                          if created is None or order['id'] in created]
+            spec_error = error
+            if spec_error is None and len(order_ids) != len(signed):
+                missing = [order['id'] for order in signed if order['id'] not in created]
+                spec_error = APIException(f'Orders missing from the response: {missing}')
+
+            results[index] = OrderResult(spec=specs[index], order_ids=order_ids, error=spec_error)
+
+            if self.__order_tracker is not None and order_ids:
+                self.__order_tracker.add_many(order_ids=order_ids, spec=specs[index])
+
+    def send_orders(self,
+                    specs: List[OrderSpec],
+                    max_workers: int = FORM_ORDER_WORKERS,
+                    batch_size: int = ORDERS_BATCH_SIZE) -> List[OrderResult]:
+        """
+        Place many orders with concurrent formOrder calls and batched POST /orderbook/orders
+
+        Results are returned in the same order as ``specs``
+        """
+        if not specs:
+            return []
+
+        results, pending = self.__prepare_signed_orders(specs=specs, max_workers=max_workers)
+
+        return self.__submit_signed_orders(specs=specs, results=results, pending=pending, batch_size=batch_size)
+
+    def prepare_ladder(self,
+                       ticker_hash: str,
+                       currency_hash: str,
+                       action: OrderBookAction,
+                       prices: List[Decimal],
+                       quantity: int,
+                       expires_at: int,
+                       max_workers: int = FORM_ORDER_WORKERS) -> List[OrderResult]:
+        """
+        Fetch and sign orders for a price ladder ahead of time
+
+        Signed orders are kept in the prepared order cache until submit_prepared()
+        takes them or they get close to ``expires_at``. The returned results
+        carry the formOrder ids, or the error for prices that could not be prepared.
+        """
+        specs = [OrderSpec(action=action,
+                           ticker_hash=ticker_hash,
+                           currency_hash=currency_hash,
+                           price=price,
+                           quantity=quantity,
+                           expires_at=expires_at) for price in prices]
+        if not specs:
+            return []
+
+        results, pending = self.__prepare_signed_orders(specs=specs, max_workers=max_workers)
+
+        for index, signed in pending:
+            if self.__prepared_orders.put(spec=specs[index],
+                                          signed_orders=signed,
+                                          body=json_codec.dumps_items(signed)):
+                results[index] = OrderResult(spec=specs[index], order_ids=[order['id'] for order in signed])
+            else:
+                results[index] = OrderResult(spec=specs[index],
+                                             order_ids=[],
+                                             error=ValueError('Order expires before it could be submitted'))
+
+        return results
+
+    def submit_prepared(self,
+                        specs: List[OrderSpec],
+                        batch_size: int = ORDERS_BATCH_SIZE) -> List[OrderResult]:
+        """
+        POST orders signed earlier by prepare_ladder()
+
+        Specs that were never prepared or whose orders expired get a
+        PreparedOrderMissingException result.
+        """
+        results: List[Optional[OrderResult]] = [None] * len(specs)
+        pending: List[Tuple[int, List[dict]]] = []
+        bodies: Dict[int, bytes] = {}
+
+        for index, spec in enumerate(specs):
+            prepared = self.__prepared_orders.take(spec)
+            if prepared is None:
+                results[index] = OrderResult(spec=spec, order_ids=[], error=PreparedOrderMissingException(spec))
+            else:
+                pending.append((index, prepared.signed_orders))
+                if prepared.body is not None:
+                    bodies[index] = prepared.body
+
+        return self.__submit_signed_orders(specs=specs,
+                                           results=results,
+                                           pending=pending,
+                                           batch_size=batch_size,
+                                           bodies=bodies)
+
+    @property
+    def prepared_orders(self) -> PreparedOrderCache:
+        return self.__prepared_orders
 
     def cancel_order(self, order_ids: List[str]):
         # TODO: Think about return
-        return self.__api_orderbook_cancel(order_ids=order_ids)
+        status = self.__api_orderbook_cancel(order_ids=order_ids)
+
+        # A 404 cancels nothing, so the orders stay tracked
+        if self.__order_tracker is not None and status == HTTPStatus.ACCEPTED:
+            self.__order_tracker.remove(order_ids)
+
+    def __get_cancel_dispatcher(self) -> CancelDispatcher:
+        with self.__cancel_dispatcher_lock:
+            if self.__cancel_dispatcher is None:
+                # Leave room for the rest of the URL in the query string budget
+                url_length = len(f'{self.__api_url}/orderbook/cancel?authAddress={self.__public_key}')
+                self.__cancel_dispatcher = CancelDispatcher(
+                    send=lambda order_ids: self.__api_orderbook_cancel_request(order_ids=order_ids).status_code,
+                    window=self.__cancel_window,
+                    max_query_length=CANCEL_MAX_URL_LENGTH - url_length)
+            return self.__cancel_dispatcher
+
+    def cancel_order_async(self, order_ids: List[str]) -> Future:
+        """
+        Queue ids for a coalesced cancel
+
+        The future resolves to a dict of CancelStatus by order id. Canceled
+        and not found orders are dropped from the order tracker.
+        """
+        future = self.__get_cancel_dispatcher().submit(order_ids)
+
+        if self.__order_tracker is not None:
+            def untrack(done: Future):
+                if not done.exception():
+                    self.__order_tracker.remove([order_id for order_id, status in done.result().items()
+                                                 if status != CancelStatus.failed])
+            future.add_done_callback(untrack)
+
+        return future
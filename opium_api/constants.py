@@ -1,2 +1,50 @@
 API_VERSION = 'v1'
 API_HOST = 'api-test.opium.exchange'
+
+# HTTP connection pool defaults
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 10
+CONNECT_TIMEOUT = 3.05
+READ_TIMEOUT = 10
+
+# Batch order submission
+ORDERS_BATCH_SIZE = 100
+FORM_ORDER_WORKERS = 10
+# Statuses that reject orders rather than the request, a batch failing with one is split to find the culprits
+ORDERS_REJECTED_STATUSES = frozenset((404, 409, 412, 422))
+
+# Account pools, workers used to fan out calls across accounts
+ACCOUNT_POOL_WORKERS = 16
+
+# Signing executor defaults
+SIGNING_WORKERS = 4
+SIGNING_CHUNK_SIZE = 16
+
+# Access token lifecycle
+ACCESS_TOKEN_TTL = 60 * 60
+ACCESS_TOKEN_REFRESH_MARGIN = 60
+ACCESS_TOKEN_RETRY_DELAY = 5
+
+# Rate limiting and 429 retries
+RATE_LIMIT_MAX_RETRIES = 3
+RATE_LIMIT_BACKOFF_BASE = 0.25
+RATE_LIMIT_BACKOFF_CAP = 10
+
+# Order book stream
+STREAM_PATH = '/orderbook/stream'
+STREAM_RECONNECT_DELAY = 1
+STREAM_RECONNECT_DELAY_CAP = 30
+
+# Cancel coalescing
+CANCEL_WINDOW = 0.005
+CANCEL_MAX_URL_LENGTH = 2048
+CANCEL_WORKERS = 4
+
+# Order tracker events that end an order
+ORDER_TERMINAL_STATUSES = frozenset(('FILLED', 'CANCELED', 'EXPIRED'))
+
+# Prepared (pre-signed) orders are dropped this many seconds before they expire
+PREPARED_ORDER_EXPIRY_MARGIN = 5
+
+# uint256 coercion plans, one per distinct orderToSign schema
+COERCION_PLAN_CACHE_SIZE = 64
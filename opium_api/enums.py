@@ -10,3 +10,15 @@ class HttpMethod(IntEnum):
 class OrderBookAction(Enum):
     ask = 'ASK'
     bid = 'BID'
+
+
+class SigningMode(Enum):
+    inline = 'inline'
+    thread = 'thread'
+    process = 'process'
+
+
+class CancelStatus(Enum):
+    canceled = 'canceled'
+    not_found = 'not_found'
+    failed = 'failed'
@@ -4,3 +4,15 @@ class APIException(Exception):
 
 class UnknownHttpMethod(Exception):
     pass
+
+
+class SequenceGapException(Exception):
+    pass
+
+
+class PreparedOrderMissingException(Exception):
+    pass
+
+
+class UnknownAccountException(Exception):
+    pass
@@ -0,0 +1,42 @@
+import json
+
+from typing import Any, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# orjson refuses to serialize integers wider than 64 bits, so dumps() falls
+# back to json for them, but it parses them as floats (8.129e+76 for a token
+# id). loads() therefore only uses orjson when asked to.
+
+def dumps(obj: Any, fast: bool = True) -> bytes:
+    if fast and orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # Integers wider than 64 bits or types orjson does not know
+            pass
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data: bytes, fast: bool = False) -> Any:
+    if fast and orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_items(items: List[Any], fast: bool = True) -> bytes:
+    """
+    Serialize list items without the enclosing brackets, see join_items()
+    """
+    return dumps(items, fast=fast)[1:-1]
+
+
+def join_items(fragments: List[Optional[bytes]]) -> bytes:
+    """
+    Join fragments from dumps_items() into one JSON array
+    """
+    return b'[' + b','.join(fragment for fragment in fragments if fragment) + b']'
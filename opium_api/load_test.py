@@ -0,0 +1,181 @@
+"""
+Connector load test
+
+    python -m opium_api.load_test --orders 2000 --concurrency 16
+    python -m opium_api.load_test --batch-size 50 --latency 0.005 --rate-limit-probability 0.01
+
+Runs against an in-process LocalApiServer unless --url is given. Prints a summary
+to stderr and the JSON report to stdout (or --output).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from libs.py_eth_sig_utils import utils
+from libs.py_eth_sig_utils.instrumentation import HistogramInstrument, LatencyHistogram
+
+from opium_api.connector import Connector
+from opium_api.enums import OrderBookAction, SigningMode
+from opium_api.exceptions import APIException
+from opium_api.local_server import LocalApiServer
+from opium_api.models import OrderSpec
+from opium_api.rate_limiter import RateLimiter
+from opium_api.signing_executor import SigningExecutor
+
+TICKER_HASH = '0x' + '5a' * 32
+CURRENCY_HASH = '0x' + 'c3' * 32
+
+
+def run_load(api_url: str,
+             orders: int = 1000,
+             concurrency: int = 8,
+             batch_size: int = 0,
+             private_key: Optional[str] = None,
+             signing_mode: SigningMode = SigningMode.inline,
+             max_retries: int = 10) -> dict:
+    """
+    Send ``orders`` orders from ``concurrency`` threads and report throughput and latency
+
+    With batch_size 0 every order is a send_order call, otherwise orders go out
+    through send_orders in batches of batch_size and latency is per batch.
+    """
+    private_key = private_key or os.urandom(32).hex()
+    public_key = utils.checksum_encode(utils.privtoaddr(bytes.fromhex(private_key)))
+    expires_at = int(time.time()) + 3600
+
+    instrument = HistogramInstrument()
+    latency = LatencyHistogram()
+    rate_limiter = RateLimiter(max_retries=max_retries)
+    signing_executor = SigningExecutor(mode=signing_mode)
+
+    specs = [OrderSpec(action=OrderBookAction.bid if i % 2 else OrderBookAction.ask,
+                       ticker_hash=TICKER_HASH,
+                       currency_hash=CURRENCY_HASH,
+                       price=Decimal(100 + i % 50) / 100,
+                       quantity=1,
+                       expires_at=expires_at) for i in range(orders)]
+    calls = [specs[i:i + batch_size] for i in range(0, orders, batch_size)] if batch_size else [[spec] for spec in specs]
+
+    with Connector(private_key=private_key,
+                   public_key=public_key,
+                   pool_maxsize=concurrency,
+                   signing_executor=signing_executor,
+                   rate_limiter=rate_limiter,
+                   instrument=instrument,
+                   api_url=api_url) as connector:
+        # Log in before the clock starts so the first calls do not all wait for the token,
+        # a rejected warm-up only means the first calls log in themselves
+        try:
+            connector.get_balance()
+        except APIException:
+            pass
+
+        def send(call_specs) -> Tuple[int, int]:
+            """
+            Place one call worth of orders, returning (created, failed)
+            """
+            start = time.perf_counter()
+            try:
+                if batch_size:
+                    results = connector.send_orders(call_specs, batch_size=batch_size)
+                    created = sum(len(result.order_ids) for result in results)
+                    failed = sum(1 for result in results if result.error is not None)
+                else:
+                    spec = call_specs[0]
+                    ret = connector.send_order(action=spec.action,
+                                               ticker_hash=spec.ticker_hash,
+                                               currency_hash=spec.currency_hash,
+                                               price=spec.price,
+                                               quantity=spec.quantity,
+                                               expires_at=spec.expires_at)
+                    # An error response is a dict, only ids in a list are created orders
+                    created = sum(1 for order in ret if isinstance(order, dict) and 'id' in order) \
+                        if isinstance(ret, list) else 0
+                    failed = 0 if created else 1
+            except Exception:
+                created, failed = 0, len(call_specs)
+            latency.record(time.perf_counter() - start)
+            return created, failed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            outcomes = list(executor.map(send, calls))
+        elapsed = time.perf_counter() - start
+
+        created = sum(created for created, _ in outcomes)
+        failed = sum(failed for _, failed in outcomes)
+
+    signing_executor.shutdown()
+
+    return {
+        'orders': orders,
+        'created': created,
+        'failed': failed,
+        'concurrency': concurrency,
+        'batch_size': batch_size,
+        'seconds': elapsed,
+        'orders_per_second': created / elapsed if elapsed else 0.0,
+        'latency': latency.snapshot(),
+        'stages': instrument.snapshot(),
+        'rate_limiter': rate_limiter.stats.as_dict(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Opium Connector load test')
+    parser.add_argument('--url', help='API base URL, a local stand-in server is started when omitted')
+    parser.add_argument('--private-key', help='hex private key, a random one by default')
+    parser.add_argument('--orders', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--batch-size', type=int, default=0, help='0 sends every order with send_order')
+    parser.add_argument('--signing-mode', choices=[mode.value for mode in SigningMode], default=SigningMode.inline.value)
+    parser.add_argument('--latency', type=float, default=0.0, help='stand-in server latency in seconds')
+    parser.add_argument('--latency-jitter', type=float, default=0.0)
+    parser.add_argument('--rate-limit-probability', type=float, default=0.0, help='stand-in server 429 probability')
+    parser.add_argument('--retry-after', type=float, help='Retry-After sent with injected 429s')
+    parser.add_argument('--verify-signatures', action='store_true', help='stand-in server recovers every signature')
+    parser.add_argument('--output', help='write the JSON report to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.url is None:
+        server = LocalApiServer(latency=args.latency,
+                                latency_jitter=args.latency_jitter,
+                                rate_limit_probability=args.rate_limit_probability,
+                                retry_after=args.retry_after,
+                                verify_signatures=args.verify_signatures).start()
+
+    try:
+        report = run_load(api_url=args.url or server.url,
+                          orders=args.orders,
+                          concurrency=args.concurrency,
+                          batch_size=args.batch_size,
+                          private_key=args.private_key,
+                          signing_mode=SigningMode(args.signing_mode))
+    finally:
+        if server is not None:
+            server.stop()
+
+    if server is not None:
+        report['server'] = server.stats
+
+    percentiles = report['latency']['percentiles']
+    print('%d/%d orders in %.2fs (%d failed), %.1f orders/s, p50 %.1f ms, p99 %.1f ms, %d rate limited' % (
+        report['created'], report['orders'], report['seconds'], report['failed'], report['orders_per_second'],
+        percentiles[50] * 1000, percentiles[99] * 1000, report['rate_limiter']['rejected']), file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,362 @@
+import asyncio
+import itertools
+import random
+import threading
+import time
+
+from decimal import Decimal, InvalidOperation
+from http import HTTPStatus
+from typing import Dict, Optional
+
+from aiohttp import web
+
+from libs.py_eth_sig_utils.signing import recover_typed_data, signature_to_v_r_s
+from libs.py_eth_sig_utils.utils import checksum_encode
+
+from opium_api.constants import API_VERSION
+from opium_api.coercion import coerce_order_to_sign
+
+DOMAIN_TYPES = [
+    {'name': 'name', 'type': 'string'},
+    {'name': 'version', 'type': 'string'},
+    {'name': 'chainId', 'type': 'uint256'},
+    {'name': 'verifyingContract', 'type': 'address'},
+]
+
+ORDER_TYPES = [
+    {'name': 'makerMarginAddress', 'type': 'address'},
+    {'name': 'takerMarginAddress', 'type': 'address'},
+    {'name': 'makerAddress', 'type': 'address'},
+    {'name': 'takerAddress', 'type': 'address'},
+    {'name': 'senderAddress', 'type': 'address'},
+    {'name': 'relayerAddress', 'type': 'address'},
+    {'name': 'affiliateAddress', 'type': 'address'},
+    {'name': 'feeTokenAddress', 'type': 'address'},
+    {'name': 'makerTokenId', 'type': 'uint256'},
+    {'name': 'makerTokenAmount', 'type': 'uint256'},
+    {'name': 'makerMarginAmount', 'type': 'uint256'},
+    {'name': 'takerTokenId', 'type': 'uint256'},
+    {'name': 'takerTokenAmount', 'type': 'uint256'},
+    {'name': 'takerMarginAmount', 'type': 'uint256'},
+    {'name': 'relayerFee', 'type': 'uint256'},
+    {'name': 'affiliateFee', 'type': 'uint256'},
+    {'name': 'nonce', 'type': 'uint256'},
+    {'name': 'expiresAt', 'type': 'uint256'},
+]
+
+LOGIN_TYPES = [
+    {'name': 'message', 'type': 'string'},
+    {'name': 'issuedAt', 'type': 'uint256'},
+]
+
+DOMAIN = {
+    'name': 'Opium Network',
+    'version': '1',
+    'chainId': 42,
+    'verifyingContract': '0x4C8e6A5c7C9aA3D5A0e8AE1C5b22DC4B03af4a7a',
+}
+
+MARGIN_TOKEN = '0x1f9840a85d5aF5bf1D1762F925BDADdC4201F984'
+RELAYER = '0x2D9f4D2b7a8cf1A0F3a4c3d9cBFd2e4A4A4B4c4d'
+ZERO_ADDRESS = '0x0000000000000000000000000000000000000000'
+WEI = 10 ** 18
+
+
+class LocalApiServer:
+    """
+    In-process stand-in for the Opium REST API, for tests and load tests
+
+    Serves /auth/loginData, /wallet/balance/tokens, /orderbook/formOrder,
+    /orderbook/orders and /orderbook/cancel on 127.0.0.1 from a background
+    thread. formOrder returns EIP-712 orderToSign payloads shaped like the real
+    ones (uint256 values as strings). Every request can be delayed by
+    ``latency`` plus up to ``latency_jitter`` seconds and answered with 429 with
+    probability ``rate_limit_probability``. With ``verify_signatures`` access
+    tokens and order signatures are recovered and checked against authAddress,
+    which costs CPU in the same process as the client.
+    """
+
+    def __init__(self,
+                 host: str = '127.0.0.1',
+                 port: int = 0,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 rate_limit_probability: float = 0.0,
+                 retry_after: Optional[float] = None,
+                 orders_per_form: int = 1,
+                 verify_signatures: bool = False,
+                 seed: Optional[int] = None):
+        if orders_per_form < 1:
+            raise ValueError('"orders_per_form" must be positive')
+
+        self.__host: str = host
+        self.__port: int = port
+        self.__latency: float = latency
+        self.__latency_jitter: float = latency_jitter
+        self.__rate_limit_probability: float = rate_limit_probability
+        self.__retry_after: Optional[float] = retry_after
+        self.__orders_per_form: int = orders_per_form
+        self.__verify_signatures: bool = verify_signatures
+        self.__random: random.Random = random.Random(seed)
+
+        self.__login_data: dict = {
+            'types': {'EIP712Domain': DOMAIN_TYPES, 'LoginData': LOGIN_TYPES},
+            'primaryType': 'LoginData',
+            'domain': DOMAIN,
+            'message': {'message': 'Sign-in to your Opium account', 'issuedAt': int(time.time())},
+        }
+        self.__ids = itertools.count(self.__random.getrandbits(32))
+        # order id -> (authAddress, orderToSign) waiting for a signature
+        self.__formed: Dict[str, tuple] = {}
+        # order id -> authAddress of open orders
+        self.__open: Dict[str, str] = {}
+        self.__tokens: Dict[str, str] = {}
+        self.__stats: Dict[str, int] = dict.fromkeys(
+            ('requests', 'rate_limited', 'orders_formed', 'orders_created', 'orders_canceled', 'rejected'), 0)
+
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__started: threading.Event = threading.Event()
+        self.__error: Optional[BaseException] = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL to pass to Connector(api_url=...)
+        """
+        return f'http://{self.__host}:{self.__port}/{API_VERSION}'
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return dict(self.__stats, open_orders=len(self.__open))
+
+    def start(self):
+        if self.__thread is not None:
+            return self
+
+        self.__started.clear()
+        self.__error = None
+        self.__thread = threading.Thread(target=self.__run, name='opium-local-api', daemon=True)
+        self.__thread.start()
+        self.__started.wait()
+        if self.__error is not None:
+            raise self.__error
+        return self
+
+    def stop(self):
+        if self.__thread is None:
+            return
+
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__thread = None
+
+    def __run(self):
+        loop = self.__loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        app = web.Application(middlewares=[self.__middleware])
+        prefix = f'/{API_VERSION}'
+        app.router.add_get(f'{prefix}/auth/loginData', self.__login_data_handler)
+        app.router.add_get(f'{prefix}/wallet/balance/tokens', self.__balance_handler)
+        app.router.add_post(f'{prefix}/orderbook/formOrder', self.__form_order_handler)
+        app.router.add_post(f'{prefix}/orderbook/orders', self.__orders_handler)
+        app.router.add_put(f'{prefix}/orderbook/cancel', self.__cancel_handler)
+
+        runner = web.AppRunner(app, access_log=None)
+        try:
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, self.__host, self.__port).start())
+            self.__port = runner.addresses[0][1]
+        except BaseException as e:
+            self.__error = e
+            self.__started.set()
+            loop.close()
+            return
+
+        self.__started.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(runner.cleanup())
+            loop.close()
+
+    @web.middleware
+    async def __middleware(self, request: web.Request, handler):
+        self.__stats['requests'] += 1
+
+        delay = self.__latency + (self.__random.uniform(0, self.__latency_jitter) if self.__latency_jitter else 0)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.__rate_limit_probability and self.__random.random() < self.__rate_limit_probability:
+            self.__stats['rate_limited'] += 1
+            headers = {'Retry-After': str(self.__retry_after)} if self.__retry_after is not None else None
+            return web.json_response({'message': 'Too many requests'},
+                                     status=HTTPStatus.TOO_MANY_REQUESTS,
+                                     headers=headers)
+
+        return await handler(request)
+
+    @staticmethod
+    def __error_response(status: HTTPStatus, message: str) -> web.Response:
+        return web.json_response({'message': message}, status=status)
+
+    def __recover(self, data: dict, signature: str) -> Optional[str]:
+        try:
+            return recover_typed_data(data, *signature_to_v_r_s(bytes.fromhex(signature[2:])))
+        except Exception:
+            return None
+
+    def __authorize(self, request: web.Request) -> Optional[str]:
+        """
+        authAddress of an authorized request, None otherwise
+        """
+        auth_address = request.query.get('authAddress', '')
+        authorization = request.headers.get('Authorization', '')
+        if not auth_address or not authorization.startswith('Bearer 0x'):
+            return None
+
+        if self.__verify_signatures:
+            token = authorization[len('Bearer '):]
+            if token not in self.__tokens:
+                address = self.__recover(self.__login_data, token)
+                if address is None:
+                    return None
+                self.__tokens[token] = address.lower()
+            if self.__tokens[token] != auth_address.lower():
+                return None
+
+        return auth_address.lower()
+
+    def __next_id(self) -> str:
+        return '%08x%016x' % (int(time.time()), next(self.__ids))
+
+    async def __login_data_handler(self, request: web.Request) -> web.Response:
+        return web.json_response(self.__login_data)
+
+    async def __balance_handler(self, request: web.Request) -> web.Response:
+        if self.__authorize(request) is None:
+            return self.__error_response(HTTPStatus.UNAUTHORIZED, 'Unauthorized')
+
+        return web.json_response([{
+            'address': MARGIN_TOKEN,
+            'symbol': 'DAI',
+            'decimals': 18,
+            'balance': str(1000 * WEI),
+        }])
+
+    async def __form_order_handler(self, request: web.Request) -> web.Response:
+        auth_address = self.__authorize(request)
+        if auth_address is None:
+            return self.__error_response(HTTPStatus.UNAUTHORIZED, 'Unauthorized')
+
+        try:
+            data = await request.json()
+            action = data['action']
+            price = Decimal(str(data['price']))
+            quantity = int(data['quantity'])
+            expires_at = int(data['expiresAt'])
+            # Derivative token ids are the ticker hash as uint256
+            token_id = str(int(data['ticker'], 16))
+            maker = checksum_encode(auth_address)
+        except (ValueError, KeyError, TypeError, InvalidOperation, AttributeError):
+            return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'Invalid order')
+
+        if action not in ('ASK', 'BID') or price <= 0 or quantity <= 0 or not data.get('currency'):
+            return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'Invalid order')
+
+        orders = []
+        for _ in range(self.__orders_per_form):
+            order_id = self.__next_id()
+            order_to_sign = {
+                'types': {'EIP712Domain': DOMAIN_TYPES, 'Order': ORDER_TYPES},
+                'primaryType': 'Order',
+                'domain': DOMAIN,
+                'message': {
+                    'makerMarginAddress': MARGIN_TOKEN,
+                    'takerMarginAddress': MARGIN_TOKEN,
+                    'makerAddress': maker,
+                    'takerAddress': ZERO_ADDRESS,
+                    'senderAddress': RELAYER,
+                    'relayerAddress': RELAYER,
+                    'affiliateAddress': ZERO_ADDRESS,
+                    'feeTokenAddress': MARGIN_TOKEN,
+                    'makerTokenId': token_id if action == 'ASK' else '0',
+                    'makerTokenAmount': str(quantity) if action == 'ASK' else '0',
+                    'makerMarginAmount': str(int(price * quantity * WEI)),
+                    'takerTokenId': token_id if action == 'BID' else '0',
+                    'takerTokenAmount': str(quantity) if action == 'BID' else '0',
+                    'takerMarginAmount': '0',
+                    'relayerFee': str(WEI // 100),
+                    'affiliateFee': '0',
+                    'nonce': str(self.__random.getrandbits(64)),
+                    'expiresAt': str(expires_at),
+                },
+            }
+            self.__formed[order_id] = (auth_address, order_to_sign)
+            orders.append({'id': order_id, 'orderToSign': order_to_sign})
+
+        self.__stats['orders_formed'] += len(orders)
+        return web.json_response(orders)
+
+    async def __orders_handler(self, request: web.Request) -> web.Response:
+        auth_address = self.__authorize(request)
+        if auth_address is None:
+            return self.__error_response(HTTPStatus.UNAUTHORIZED, 'Unauthorized')
+
+        try:
+            signed_orders = await request.json()
+            ids = [signed_order['id'] for signed_order in signed_orders]
+            signatures = [signed_order['signature'] for signed_order in signed_orders]
+            duplicated = len(set(ids)) != len(ids)
+        except (ValueError, KeyError, TypeError):
+            return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'Invalid orders')
+
+        if duplicated:
+            self.__stats['rejected'] += len(ids)
+            return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'Duplicate order ids')
+
+        formed = [self.__formed.get(order_id) for order_id in ids]
+        if any(entry is None or entry[0] != auth_address for entry in formed):
+            self.__stats['rejected'] += len(ids)
+            return self.__error_response(HTTPStatus.NOT_FOUND, 'Order not found')
+
+        if self.__verify_signatures:
+            for (_, order_to_sign), signature in zip(formed, signatures):
+                address = self.__recover(coerce_order_to_sign(order_to_sign), signature)
+                if address is None or address.lower() != auth_address:
+                    self.__stats['rejected'] += len(ids)
+                    return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'Invalid signature')
+
+        for order_id in ids:
+            del self.__formed[order_id]
+            self.__open[order_id] = auth_address
+
+        self.__stats['orders_created'] += len(ids)
+        return web.json_response([{'id': order_id} for order_id in ids], status=HTTPStatus.CREATED)
+
+    async def __cancel_handler(self, request: web.Request) -> web.Response:
+        auth_address = self.__authorize(request)
+        if auth_address is None:
+            return self.__error_response(HTTPStatus.UNAUTHORIZED, 'Unauthorized')
+
+        ids = request.query.getall('ids[]', [])
+        if not ids:
+            return self.__error_response(HTTPStatus.UNPROCESSABLE_ENTITY, 'No order ids')
+
+        # Nothing is canceled unless every id is an open order of this account
+        if any(self.__open.get(order_id) != auth_address for order_id in ids):
+            return self.__error_response(HTTPStatus.NOT_FOUND, 'Order not found')
+
+        for order_id in set(ids):
+            del self.__open[order_id]
+
+        self.__stats['orders_canceled'] += len(set(ids))
+        return web.Response(status=HTTPStatus.ACCEPTED)
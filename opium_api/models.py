@@ -0,0 +1,25 @@
+from decimal import Decimal
+from typing import Any, NamedTuple, List, Optional
+
+from opium_api.enums import OrderBookAction
+
+
+class OrderSpec(NamedTuple):
+    action: OrderBookAction
+    ticker_hash: str
+    currency_hash: str
+    price: Decimal
+    quantity: int
+    expires_at: int
+
+
+class OrderResult(NamedTuple):
+    spec: OrderSpec
+    order_ids: List[str]
+    error: Optional[Exception] = None
+
+
+class AccountResult(NamedTuple):
+    public_key: str
+    result: Any = None
+    error: Optional[Exception] = None
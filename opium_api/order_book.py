@@ -0,0 +1,138 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sortedcontainers import SortedDict
+
+from opium_api.enums import OrderBookAction
+from opium_api.exceptions import SequenceGapException
+
+
+Level = Tuple[Decimal, int]
+
+
+class BookSide:
+    """
+    Price levels of one side of a book, kept sorted by price
+    """
+    __slots__ = ('__levels', '__descending')
+
+    def __init__(self, descending: bool):
+        self.__levels: SortedDict = SortedDict()
+        self.__descending: bool = descending
+
+    def __len__(self) -> int:
+        return len(self.__levels)
+
+    def clear(self):
+        self.__levels.clear()
+
+    def update(self, price: Decimal, quantity: int):
+        if quantity:
+            self.__levels[price] = quantity
+        else:
+            self.__levels.pop(price, None)
+
+    def best(self) -> Optional[Level]:
+        if not self.__levels:
+            return None
+        return self.__levels.peekitem(-1 if self.__descending else 0)
+
+    def top(self, depth: int) -> List[Level]:
+        stop = min(depth, len(self.__levels))
+        if self.__descending:
+            prices = self.__levels.islice(len(self.__levels) - stop, len(self.__levels), reverse=True)
+        else:
+            prices = self.__levels.islice(0, stop)
+        return [(price, self.__levels[price]) for price in prices]
+
+
+class TickerBook:
+    __slots__ = ('sides', 'sequence')
+
+    def __init__(self):
+        self.sides: Dict[OrderBookAction, BookSide] = {
+            OrderBookAction.bid: BookSide(descending=True),
+            OrderBookAction.ask: BookSide(descending=False),
+        }
+        self.sequence: Optional[int] = None
+
+
+class OrderBook:
+    """
+    In-memory price-level books keyed by ticker hash
+
+    Updates are O(log n) per level, best bid/ask is O(1) and top-N depth is O(N).
+    """
+
+    def __init__(self):
+        self.__books: Dict[str, TickerBook] = {}
+
+    def __book(self, ticker_hash: str) -> TickerBook:
+        book = self.__books.get(ticker_hash)
+        if book is None:
+            book = self.__books[ticker_hash] = TickerBook()
+        return book
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self.__books)
+
+    def sequence(self, ticker_hash: str) -> Optional[int]:
+        book = self.__books.get(ticker_hash)
+        return book.sequence if book else None
+
+    def apply_snapshot(self,
+                       ticker_hash: str,
+                       sequence: int,
+                       bids: Iterable[Tuple[Decimal, int]],
+                       asks: Iterable[Tuple[Decimal, int]]):
+        book = self.__book(ticker_hash)
+        for side, levels in ((OrderBookAction.bid, bids), (OrderBookAction.ask, asks)):
+            book.sides[side].clear()
+            for price, quantity in levels:
+                book.sides[side].update(Decimal(price), int(quantity))
+        book.sequence = sequence
+
+    def apply_update(self,
+                     ticker_hash: str,
+                     sequence: int,
+                     changes: Iterable[Tuple[OrderBookAction, Decimal, int]]):
+        """
+        Apply level changes, a zero quantity removes the level
+
+        Raises SequenceGapException when ``sequence`` does not follow the last
+        applied one; the book must then be resynced from a snapshot.
+        """
+        book = self.__books.get(ticker_hash)
+        if book is None or book.sequence is None:
+            raise SequenceGapException(f'No snapshot for {ticker_hash}')
+
+        if sequence <= book.sequence:
+            # Already applied
+            return
+
+        if sequence != book.sequence + 1:
+            expected = book.sequence + 1
+            book.sequence = None
+            raise SequenceGapException(f'Expected sequence {expected} for {ticker_hash}, got {sequence}')
+
+        for side, price, quantity in changes:
+            book.sides[side].update(Decimal(price), int(quantity))
+        book.sequence = sequence
+
+    def invalidate(self, ticker_hash: str):
+        book = self.__books.get(ticker_hash)
+        if book is not None:
+            book.sequence = None
+
+    def best_bid(self, ticker_hash: str) -> Optional[Level]:
+        book = self.__books.get(ticker_hash)
+        return book.sides[OrderBookAction.bid].best() if book else None
+
+    def best_ask(self, ticker_hash: str) -> Optional[Level]:
+        book = self.__books.get(ticker_hash)
+        return book.sides[OrderBookAction.ask].best() if book else None
+
+    def depth(self, ticker_hash: str, side: OrderBookAction, levels: int) -> List[Level]:
+        book = self.__books.get(ticker_hash)
+        return book.sides[side].top(levels) if book else []
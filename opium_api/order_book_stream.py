@@ -0,0 +1,162 @@
+import asyncio
+import json
+
+from decimal import Decimal
+from typing import Optional, Set
+
+import aiohttp
+
+from opium_api.enums import OrderBookAction
+from opium_api.constants import API_VERSION, API_HOST, STREAM_PATH, STREAM_RECONNECT_DELAY, STREAM_RECONNECT_DELAY_CAP
+from opium_api.exceptions import SequenceGapException
+from opium_api.order_book import OrderBook
+
+
+class OrderBookStream:
+    """
+    Websocket client keeping an OrderBook up to date from snapshot and update messages
+
+    Client messages:
+        {"type": "subscribe", "ticker": <ticker hash>}
+        {"type": "unsubscribe", "ticker": <ticker hash>}
+
+    Server messages:
+        {"type": "snapshot", "ticker": <ticker hash>, "sequence": <int>,
+         "bids": [[<price>, <quantity>], ...], "asks": [[<price>, <quantity>], ...]}
+        {"type": "update", "ticker": <ticker hash>, "sequence": <int>,
+         "changes": [["BID" | "ASK", <price>, <quantity>], ...]}
+
+    A subscribe is answered with a snapshot, so a sequence gap or a frame that
+    can not be applied is resynced by subscribing again. All subscriptions are
+    restored after a reconnect.
+    """
+
+    def __init__(self,
+                 url: Optional[str] = None,
+                 book: Optional[OrderBook] = None,
+                 reconnect_delay: float = STREAM_RECONNECT_DELAY,
+                 reconnect_delay_cap: float = STREAM_RECONNECT_DELAY_CAP):
+        self.__url: str = url or f'wss://{API_HOST}/{API_VERSION}{STREAM_PATH}'
+        self.book: OrderBook = book or OrderBook()
+        self.__reconnect_delay: float = reconnect_delay
+        self.__reconnect_delay_cap: float = reconnect_delay_cap
+
+        self.__tickers: Set[str] = set()
+        self.__session: Optional[aiohttp.ClientSession] = None
+        self.__ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.__closed: bool = False
+        self.resyncs: int = 0
+        self.malformed: int = 0
+        self.reconnects: int = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def __send(self, message: dict):
+        if self.__ws is not None and not self.__ws.closed:
+            await self.__ws.send_str(json.dumps(message))
+
+    async def subscribe(self, ticker_hash: str):
+        self.__tickers.add(ticker_hash)
+        await self.__send({'type': 'subscribe', 'ticker': ticker_hash})
+
+    async def unsubscribe(self, ticker_hash: str):
+        self.__tickers.discard(ticker_hash)
+        self.book.invalidate(ticker_hash)
+        await self.__send({'type': 'unsubscribe', 'ticker': ticker_hash})
+
+    async def __resync(self, ticker_hash: str):
+        self.resyncs += 1
+        self.book.invalidate(ticker_hash)
+        await self.__send({'type': 'subscribe', 'ticker': ticker_hash})
+
+    def __apply(self, ticker_hash: str, message: dict):
+        if message['type'] == 'snapshot':
+            self.book.apply_snapshot(ticker_hash=ticker_hash,
+                                     sequence=message['sequence'],
+                                     bids=message['bids'],
+                                     asks=message['asks'])
+
+        elif message['type'] == 'update':
+            # Updates arriving while waiting for the resync snapshot are dropped
+            if self.book.sequence(ticker_hash) is None:
+                return
+
+            self.book.apply_update(ticker_hash=ticker_hash,
+                                   sequence=message['sequence'],
+                                   changes=[(OrderBookAction(side), Decimal(price), quantity)
+                                            for side, price, quantity in message['changes']])
+
+    async def __handle(self, message: dict):
+        ticker_hash = message.get('ticker')
+        if not isinstance(ticker_hash, str) or ticker_hash not in self.__tickers:
+            return
+
+        try:
+            self.__apply(ticker_hash, message)
+        except SequenceGapException:
+            await self.__resync(ticker_hash)
+        except (KeyError, TypeError, ValueError, ArithmeticError):
+            # The book can not be trusted after a frame we could not apply
+            self.malformed += 1
+            await self.__resync(ticker_hash)
+
+    async def __listen(self):
+        async with self.__session.ws_connect(self.__url, heartbeat=30) as ws:
+            self.__ws = ws
+            # subscribe() may add tickers while a resubscribe is awaited
+            for ticker_hash in list(self.__tickers):
+                self.book.invalidate(ticker_hash)
+                await self.__send({'type': 'subscribe', 'ticker': ticker_hash})
+
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    try:
+                        message = json.loads(msg.data, parse_float=Decimal)
+                    except ValueError:
+                        message = None
+
+                    if isinstance(message, dict):
+                        await self.__handle(message)
+                    else:
+                        # Not tied to a ticker, so there is nothing to resync
+                        self.malformed += 1
+                elif msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.ERROR):
+                    break
+
+        self.__ws = None
+
+    async def run(self):
+        """
+        Stream until close() is called, reconnecting with exponential backoff
+        """
+        self.__session = aiohttp.ClientSession()
+        delay = self.__reconnect_delay
+        try:
+            while not self.__closed:
+                try:
+                    await self.__listen()
+                    delay = self.__reconnect_delay
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    pass
+
+                if self.__closed:
+                    break
+
+                for ticker_hash in self.__tickers:
+                    self.book.invalidate(ticker_hash)
+
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.__reconnect_delay_cap)
+        finally:
+            await self.__session.close()
+            self.__session = None
+
+    async def close(self):
+        self.__closed = True
+        if self.__ws is not None:
+            await self.__ws.close()
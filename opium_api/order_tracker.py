@@ -0,0 +1,169 @@
+import heapq
+import time
+
+from decimal import Decimal
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from opium_api.enums import OrderBookAction
+from opium_api.constants import ORDER_TERMINAL_STATUSES
+from opium_api.models import OrderSpec
+
+
+class TrackedOrder:
+    __slots__ = ('id', 'action', 'ticker_hash', 'currency_hash', 'price', 'quantity', 'expires_at')
+
+    def __init__(self,
+                 order_id: str,
+                 action: OrderBookAction,
+                 ticker_hash: str,
+                 currency_hash: str,
+                 price: Decimal,
+                 quantity: int,
+                 expires_at: int):
+        self.id: str = order_id
+        self.action: OrderBookAction = action
+        self.ticker_hash: str = ticker_hash
+        self.currency_hash: str = currency_hash
+        self.price: Decimal = price
+        self.quantity: int = quantity
+        self.expires_at: int = expires_at
+
+    def __repr__(self):
+        return f'TrackedOrder({self.id!r}, {self.action}, {self.ticker_hash!r}, {self.price}, {self.quantity})'
+
+
+class OrderTracker:
+    """
+    Index of our live orders by id, ticker hash, currency hash, side and expiry
+
+    Lookups by any combination of ticker, currency and side are served from
+    a prebuilt index without touching the API.
+    """
+
+    def __init__(self):
+        self.__orders: Dict[str, TrackedOrder] = {}
+        self.__by_ticker: Dict[str, Set[str]] = {}
+        self.__by_ticker_side: Dict[Tuple[str, OrderBookAction], Set[str]] = {}
+        self.__by_currency: Dict[str, Set[str]] = {}
+        self.__by_side: Dict[OrderBookAction, Set[str]] = {OrderBookAction.bid: set(), OrderBookAction.ask: set()}
+        # (expires_at, id) heap, entries of removed orders are skipped lazily
+        self.__expiry: List[Tuple[int, str]] = []
+        self.__lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.__orders)
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.__orders
+
+    def get(self, order_id: str) -> Optional[TrackedOrder]:
+        return self.__orders.get(order_id)
+
+    def __add(self, order: TrackedOrder):
+        if order.id in self.__orders:
+            self.__remove(order.id)
+
+        self.__orders[order.id] = order
+        self.__by_ticker.setdefault(order.ticker_hash, set()).add(order.id)
+        self.__by_ticker_side.setdefault((order.ticker_hash, order.action), set()).add(order.id)
+        self.__by_currency.setdefault(order.currency_hash, set()).add(order.id)
+        self.__by_side[order.action].add(order.id)
+        heapq.heappush(self.__expiry, (order.expires_at, order.id))
+
+        if len(self.__expiry) > 2 * len(self.__orders) + 1024:
+            self.__expiry = [(order.expires_at, order.id) for order in self.__orders.values()]
+            heapq.heapify(self.__expiry)
+
+    @staticmethod
+    def __discard(index: dict, key, order_id: str):
+        ids = index.get(key)
+        if ids is not None:
+            ids.discard(order_id)
+            if not ids:
+                del index[key]
+
+    def __remove(self, order_id: str) -> Optional[TrackedOrder]:
+        order = self.__orders.pop(order_id, None)
+        if order is None:
+            return None
+
+        self.__discard(self.__by_ticker, order.ticker_hash, order_id)
+        self.__discard(self.__by_ticker_side, (order.ticker_hash, order.action), order_id)
+        self.__discard(self.__by_currency, order.currency_hash, order_id)
+        self.__by_side[order.action].discard(order_id)
+        return order
+
+    def add(self, order_id: str, spec: OrderSpec) -> TrackedOrder:
+        order = TrackedOrder(order_id=order_id,
+                             action=spec.action,
+                             ticker_hash=spec.ticker_hash,
+                             currency_hash=spec.currency_hash,
+                             price=spec.price,
+                             quantity=spec.quantity,
+                             expires_at=spec.expires_at)
+        with self.__lock:
+            self.__add(order)
+        return order
+
+    def add_many(self, order_ids: Iterable[str], spec: OrderSpec):
+        for order_id in order_ids:
+            self.add(order_id, spec)
+
+    def remove(self, order_ids: Iterable[str]) -> List[TrackedOrder]:
+        with self.__lock:
+            removed = [self.__remove(order_id) for order_id in order_ids]
+        return [order for order in removed if order is not None]
+
+    def on_event(self, order_id: str, status: str, remaining_quantity: Optional[int] = None):
+        """
+        Apply an order event: "FILLED", "CANCELED" and "EXPIRED" drop the order,
+        "PARTIALLY_FILLED" with a remaining quantity updates it, anything else is ignored
+        """
+        with self.__lock:
+            if status in ORDER_TERMINAL_STATUSES:
+                self.__remove(order_id)
+            elif status == 'PARTIALLY_FILLED' and remaining_quantity:
+                order = self.__orders.get(order_id)
+                if order is not None:
+                    order.quantity = remaining_quantity
+
+    def remove_expired(self, now: Optional[float] = None) -> List[TrackedOrder]:
+        now = time.time() if now is None else now
+        removed = []
+        with self.__lock:
+            while self.__expiry and self.__expiry[0][0] <= now:
+                expires_at, order_id = heapq.heappop(self.__expiry)
+                order = self.__orders.get(order_id)
+                # Skip heap entries left behind by removed or re-added orders
+                if order is not None and order.expires_at == expires_at:
+                    removed.append(self.__remove(order_id))
+        return removed
+
+    def ids(self,
+            ticker_hash: Optional[str] = None,
+            action: Optional[OrderBookAction] = None,
+            currency_hash: Optional[str] = None) -> Set[str]:
+        with self.__lock:
+            if ticker_hash is not None and action is not None:
+                ids = self.__by_ticker_side.get((ticker_hash, action), set())
+            elif ticker_hash is not None:
+                ids = self.__by_ticker.get(ticker_hash, set())
+            elif action is not None:
+                ids = self.__by_side[action]
+            elif currency_hash is not None:
+                return set(self.__by_currency.get(currency_hash, set()))
+            else:
+                return set(self.__orders)
+
+            if currency_hash is not None:
+                return ids & self.__by_currency.get(currency_hash, set())
+            return set(ids)
+
+    def orders(self,
+               ticker_hash: Optional[str] = None,
+               action: Optional[OrderBookAction] = None,
+               currency_hash: Optional[str] = None) -> List[TrackedOrder]:
+        return [self.__orders[order_id]
+                for order_id in self.ids(ticker_hash=ticker_hash, action=action, currency_hash=currency_hash)
+                if order_id in self.__orders]
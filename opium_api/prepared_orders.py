@@ -0,0 +1,70 @@
+import heapq
+import time
+
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from opium_api.constants import PREPARED_ORDER_EXPIRY_MARGIN
+from opium_api.models import OrderSpec
+
+
+class PreparedOrders(NamedTuple):
+    signed_orders: List[dict]
+    # Pre-serialized signed orders, see json_codec.dumps_items()
+    body: Optional[bytes] = None
+
+
+class PreparedOrderCache:
+    """
+    Signed orders waiting to be submitted, keyed by OrderSpec
+
+    Entries are evicted ``expiry_margin`` seconds before their ``expires_at``
+    so a prepared order is never submitted after it expired.
+    """
+
+    def __init__(self, expiry_margin: float = PREPARED_ORDER_EXPIRY_MARGIN):
+        self.__expiry_margin: float = expiry_margin
+        self.__orders: Dict[OrderSpec, PreparedOrders] = {}
+        self.__expiry: List[Tuple[int, int, OrderSpec]] = []
+        # Tie breaker so the heap never compares OrderSpecs
+        self.__counter: int = 0
+        self.__lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        with self.__lock:
+            self.__evict(time.time())
+            return len(self.__orders)
+
+    def __evict(self, now: float):
+        while self.__expiry and self.__expiry[0][0] - self.__expiry_margin <= now:
+            _, _, spec = heapq.heappop(self.__expiry)
+            self.__orders.pop(spec, None)
+
+    def put(self, spec: OrderSpec, signed_orders: List[dict], body: Optional[bytes] = None) -> bool:
+        """
+        Store signed orders, returns False when they are too close to expiry to be worth keeping
+        """
+        with self.__lock:
+            now = time.time()
+            self.__evict(now)
+            if spec.expires_at - self.__expiry_margin <= now:
+                return False
+
+            if spec not in self.__orders:
+                self.__counter += 1
+                heapq.heappush(self.__expiry, (spec.expires_at, self.__counter, spec))
+            self.__orders[spec] = PreparedOrders(signed_orders=signed_orders, body=body)
+            return True
+
+    def take(self, spec: OrderSpec) -> Optional[PreparedOrders]:
+        """
+        Remove and return the signed orders for ``spec``, signed orders are good for one submission only
+        """
+        with self.__lock:
+            self.__evict(time.time())
+            return self.__orders.pop(spec, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__orders.clear()
+            self.__expiry.clear()
@@ -0,0 +1,154 @@
+import random
+import time
+
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from opium_api.constants import RATE_LIMIT_MAX_RETRIES, RATE_LIMIT_BACKOFF_BASE, RATE_LIMIT_BACKOFF_CAP
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError('"rate" must be positive')
+        if capacity < 1:
+            raise ValueError('"capacity" must be at least 1')
+
+        self.__rate: float = rate
+        self.__capacity: float = capacity
+        self.__tokens: float = capacity
+        self.__clock: Callable[[], float] = clock
+        self.__updated_at: float = clock()
+        self.__lock: Lock = Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token and return how long the caller has to wait before using it
+        """
+        with self.__lock:
+            now = self.__clock()
+            self.__tokens = min(self.__capacity, self.__tokens + (now - self.__updated_at) * self.__rate)
+            self.__updated_at = now
+            self.__tokens -= 1
+
+            # A negative balance is a reservation against tokens that are not refilled yet
+            return 0 if self.__tokens >= 0 else -self.__tokens / self.__rate
+
+
+class RateLimiterStats:
+    def __init__(self):
+        self.throttled: int = 0
+        self.rejected: int = 0
+        self.retried: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'throttled': self.throttled, 'rejected': self.rejected, 'retried': self.retried}
+
+
+class RateLimiter:
+    """
+    Token bucket per endpoint family ("/orderbook/formOrder" -> "orderbook") with 429 backoff
+
+    Buckets hand out wait times instead of sleeping themselves, so one limiter
+    can be shared between threads and asyncio tasks.
+
+    Client side limiting is opt-in: the API does not publish its limits, so
+    without ``limits`` or ``default_limit`` requests are never delayed up front
+    and only 429 responses are retried, after Retry-After (at most
+    ``backoff_cap`` seconds) or an exponential backoff with full jitter.
+    """
+
+    def __init__(self,
+                 limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_limit: Optional[Tuple[float, float]] = None,
+                 max_retries: int = RATE_LIMIT_MAX_RETRIES,
+                 backoff_base: float = RATE_LIMIT_BACKOFF_BASE,
+                 backoff_cap: float = RATE_LIMIT_BACKOFF_CAP):
+        self.__limits: Dict[str, Tuple[float, float]] = dict(limits or {})
+        self.__default_limit: Optional[Tuple[float, float]] = default_limit
+        self.__buckets: Dict[str, Optional[TokenBucket]] = {}
+        self.__lock: Lock = Lock()
+        self.max_retries: int = max_retries
+        self.__backoff_base: float = backoff_base
+        self.__backoff_cap: float = backoff_cap
+        self.stats: RateLimiterStats = RateLimiterStats()
+
+    @staticmethod
+    def family(endpoint: str) -> str:
+        return endpoint.strip('/').split('/', 1)[0]
+
+    def __bucket(self, endpoint: str) -> Optional[TokenBucket]:
+        family = self.family(endpoint)
+        try:
+            return self.__buckets[family]
+        except KeyError:
+            pass
+
+        with self.__lock:
+            if family not in self.__buckets:
+                limit = self.__limits.get(family, self.__default_limit)
+                self.__buckets[family] = TokenBucket(*limit) if limit else None
+            return self.__buckets[family]
+
+    def __reserve(self, endpoint: str) -> float:
+        bucket = self.__bucket(endpoint)
+        delay = bucket.reserve() if bucket else 0
+        if delay > 0:
+            with self.__lock:
+                self.stats.throttled += 1
+        return delay
+
+    def acquire(self, endpoint: str):
+        delay = self.__reserve(endpoint)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, endpoint: str):
+        # Imported here so the synchronous Connector does not pay for asyncio
+        import asyncio
+
+        delay = self.__reserve(endpoint)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def __parse_retry_after(self, retry_after: Optional[str]) -> Optional[float]:
+        if not retry_after:
+            return None
+
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError, OverflowError):
+                return None
+
+        if delay != delay:
+            # NaN
+            return None
+
+        # A far off Retry-After would stall the caller, wait at most backoff_cap
+        return min(max(delay, 0), self.__backoff_cap)
+
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Record a 429 response and return how long to wait before retry number ``attempt + 1``
+        """
+        with self.__lock:
+            self.stats.rejected += 1
+            self.stats.retried += 1
+
+        delay = self.__parse_retry_after(retry_after)
+        if delay is not None:
+            return delay
+
+        # Full jitter keeps clients that were rejected together from retrying together
+        return random.uniform(0, min(self.__backoff_cap, self.__backoff_base * 2 ** attempt))
+
+    def rejected(self):
+        """
+        Record a 429 response that will not be retried
+        """
+        with self.__lock:
+            self.stats.rejected += 1
@@ -0,0 +1,68 @@
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from threading import Lock
+from typing import List, Optional
+
+from libs.py_eth_sig_utils.signing import v_r_s_to_signature, Signer
+
+
+from opium_api.enums import SigningMode
+from opium_api.constants import SIGNING_WORKERS, SIGNING_CHUNK_SIZE
+
+
+def _sign_chunk(signer: Signer, messages: List[dict]) -> List[str]:
+    # Module level so it can be pickled for the process pool
+    return [v_r_s_to_signature(*signer.sign_typed_data(msg)).hex() for msg in messages]
+
+
+class SigningExecutor:
+    def __init__(self,
+                 mode: SigningMode = SigningMode.inline,
+                 workers: int = SIGNING_WORKERS,
+                 chunk_size: int = SIGNING_CHUNK_SIZE):
+        if workers < 1:
+            raise ValueError('"workers" must be positive')
+        if chunk_size < 1:
+            raise ValueError('"chunk_size" must be positive')
+
+        self.__mode: SigningMode = mode
+        self.__workers: int = workers
+        self.__chunk_size: int = chunk_size
+        self.__executor: Optional[Executor] = None
+        self.__lock: Lock = Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+    @property
+    def mode(self) -> SigningMode:
+        return self.__mode
+
+    def __get_executor(self) -> Executor:
+        with self.__lock:
+            if self.__executor is None:
+                if self.__mode == SigningMode.thread:
+                    self.__executor = ThreadPoolExecutor(max_workers=self.__workers)
+                else:
+                    self.__executor = ProcessPoolExecutor(max_workers=self.__workers)
+            return self.__executor
+
+    def sign(self, signer: Signer, messages: List[dict]) -> List[str]:
+        """
+        Sign EIP-712 messages, returning hex signatures in the same order as ``messages``
+        """
+        if self.__mode == SigningMode.inline or len(messages) <= self.__chunk_size:
+            return _sign_chunk(signer, messages)
+
+        chunks = [messages[i:i + self.__chunk_size] for i in range(0, len(messages), self.__chunk_size)]
+        futures = [self.__get_executor().submit(_sign_chunk, signer, chunk) for chunk in chunks]
+
+        return [signature for future in futures for signature in future.result()]
+
+    def shutdown(self, wait: bool = True):
+        with self.__lock:
+            if self.__executor is not None:
+                self.__executor.shutdown(wait=wait)
+                self.__executor = None
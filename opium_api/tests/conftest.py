@@ -0,0 +1,45 @@
+import json
+import threading
+
+from unittest import mock
+
+import pytest
+
+from libs.py_eth_sig_utils.benchmarks.fixtures import MAIL
+
+from opium_api.connector import Connector
+
+
+class Response:
+    """
+    The parts of requests.Response that Connector reads
+    """
+
+    def __init__(self, status_code: int, data):
+        self.status_code = status_code
+        self.content = json.dumps(data).encode()
+        self.headers = {}
+
+
+@pytest.fixture
+def fake_api(request):
+    """
+    Answer Connector HTTP calls with the test case's fake_call() instead of the network
+
+    Logins get the MAIL typed data, every call is recorded in ``calls`` as
+    (endpoint, arguments) and ``lock`` guards state shared with the
+    connector threads.
+    """
+    test = request.instance
+    test.calls = []
+    test.lock = threading.Lock()
+
+    def make_public_call(connector, endpoint, method, headers=None, arguments=None, data=None, body=None):
+        with test.lock:
+            test.calls.append((endpoint, arguments or {}))
+        if endpoint == '/auth/loginData':
+            return Response(200, MAIL)
+        return test.fake_call(endpoint, arguments=arguments, data=data, body=body)
+
+    with mock.patch.object(Connector, '_Connector__make_public_call', make_public_call):
+        yield
@@ -0,0 +1,68 @@
+import unittest
+
+from unittest import mock
+
+import pytest
+
+from opium_api.account_pool import AccountPool
+from opium_api.exceptions import APIException, UnknownAccountException
+from opium_api.tests.conftest import Response
+
+ACCOUNTS = [('%02x' % (i + 1) * 32, '0x%040x' % (i + 1)) for i in range(4)]
+FAILING_ACCOUNT = ACCOUNTS[2][1]
+
+
+@pytest.mark.usefixtures('fake_api')
+class TestAccountPool(unittest.TestCase):
+
+    def fake_call(self, endpoint, arguments=None, data=None, body=None):
+        if endpoint == '/wallet/balance/tokens':
+            if arguments['authAddress'] == FAILING_ACCOUNT:
+                return Response(500, {})
+            return Response(200, [{'address': arguments['authAddress'], 'balance': '1'}])
+        return Response(404, {})
+
+    def test_routes_by_public_key(self):
+        with AccountPool(ACCOUNTS) as pool:
+            self.assertEqual(4, len(pool))
+            public_key = ACCOUNTS[1][1]
+
+            balance = pool.get_balance(public_key.upper().replace('0X', '0x'))
+
+            self.assertEqual(public_key, balance[0]['address'])
+            self.assertEqual(('/wallet/balance/tokens', {'authAddress': public_key}), self.calls[-1])
+            with self.assertRaises(UnknownAccountException):
+                pool.get_balance('0x' + 'ff' * 20)
+
+    def test_balance_snapshot(self):
+        with AccountPool(ACCOUNTS, workers=4) as pool:
+            results = pool.get_balances()
+
+        self.assertEqual([public_key for _, public_key in ACCOUNTS], [result.public_key for result in results])
+        for result in results:
+            if result.public_key == FAILING_ACCOUNT:
+                self.assertIsInstance(result.error, APIException)
+                self.assertIsNone(result.result)
+            else:
+                self.assertIsNone(result.error)
+                self.assertEqual(result.public_key, result.result[0]['address'])
+        # One login per account, then one balance call per account
+        self.assertEqual(4, sum(1 for endpoint, _ in self.calls if endpoint == '/auth/loginData'))
+
+    def test_shares_session_and_limiter(self):
+        pool = AccountPool(ACCOUNTS)
+        connectors = [pool.connector(public_key) for _, public_key in ACCOUNTS]
+        sessions = {id(connector._Connector__session) for connector in connectors}
+        limiters = {id(connector._Connector__rate_limiter) for connector in connectors}
+        self.assertEqual(1, len(sessions))
+        self.assertEqual({id(pool.rate_limiter)}, limiters)
+
+        session = connectors[0]._Connector__session
+        with mock.patch.object(session, 'close') as close:
+            pool.remove_account(ACCOUNTS[0][1])
+            close.assert_not_called()
+            self.assertNotIn(ACCOUNTS[0][1], pool)
+
+            pool.close()
+            close.assert_called_once_with()
+        self.assertEqual(0, len(pool))
@@ -0,0 +1,68 @@
+import time
+import unittest
+
+from http import HTTPStatus
+from threading import Lock
+
+from opium_api.cancel_dispatcher import CancelDispatcher
+from opium_api.enums import CancelStatus
+
+
+class TestCancelDispatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.lock = Lock()
+        self.missing = {'b2'}
+
+    def send(self, order_ids):
+        with self.lock:
+            self.calls.append(list(order_ids))
+        if 'boom' in order_ids:
+            return HTTPStatus.UNPROCESSABLE_ENTITY
+        if self.missing & set(order_ids):
+            return HTTPStatus.NOT_FOUND
+        return HTTPStatus.ACCEPTED
+
+    def test_coalesces_callers(self):
+        with CancelDispatcher(self.send, window=0.05) as dispatcher:
+            first = dispatcher.submit(['a1', 'a2'])
+            second = dispatcher.submit(['a2', 'a3'])
+            self.assertEqual({'a1': CancelStatus.canceled, 'a2': CancelStatus.canceled}, first.result(timeout=5))
+            self.assertEqual({'a2': CancelStatus.canceled, 'a3': CancelStatus.canceled}, second.result(timeout=5))
+        self.assertEqual([['a1', 'a2', 'a3']], self.calls)
+
+    def test_window_outlasts_submits(self):
+        with CancelDispatcher(self.send, window=0.2) as dispatcher:
+            futures = []
+            for i in range(5):
+                futures.append(dispatcher.submit([str(i)]))
+                time.sleep(0.01)
+            for future in futures:
+                future.result(timeout=5)
+        self.assertEqual([['0', '1', '2', '3', '4']], self.calls)
+
+    def test_full_batch_does_not_wait(self):
+        # Room for two "&ids%5B%5D=cN" parameters per request
+        with CancelDispatcher(self.send, window=5, max_query_length=2 * 13) as dispatcher:
+            start = time.monotonic()
+            dispatcher.submit(['c1', 'c2']).result(timeout=5)
+            self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual([['c1', 'c2']], self.calls)
+
+    def test_splits_by_query_length_and_resolves_not_found(self):
+        order_ids = ['b%d' % i for i in range(10)]
+        # Room for three "&ids%5B%5D=bN" parameters per request
+        with CancelDispatcher(self.send, window=0, max_query_length=3 * 13) as dispatcher:
+            statuses = dispatcher.submit(order_ids).result(timeout=5)
+            failed = dispatcher.submit(['boom']).result(timeout=5)
+
+        self.assertEqual(CancelStatus.not_found, statuses.pop('b2'))
+        self.assertEqual({CancelStatus.canceled}, set(statuses.values()))
+        self.assertTrue(all(len(call) <= 3 for call in self.calls))
+        self.assertIn(['b0'], self.calls)
+        self.assertEqual({'boom': CancelStatus.failed}, failed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import copy
+import unittest
+
+from libs.py_eth_sig_utils.benchmarks.fixtures import opium_order
+from libs.py_eth_sig_utils.eip712.encoding import encode_typed_data
+
+from opium_api.coercion import coerce_order_to_sign, coercion_plan
+
+
+def as_strings(order_to_sign: dict) -> dict:
+    # Shape of the payload as the API sends it
+    order_to_sign = copy.deepcopy(order_to_sign)
+    for field in order_to_sign['types'][order_to_sign['primaryType']]:
+        if field['type'] == 'uint256':
+            order_to_sign['message'][field['name']] = str(order_to_sign['message'][field['name']])
+    order_to_sign['domain']['chainId'] = str(order_to_sign['domain']['chainId'])
+    return order_to_sign
+
+
+class TestCoercionPlan(unittest.TestCase):
+
+    def test_matches_signed_payload(self):
+        expected = opium_order(7)
+        received = as_strings(expected)
+        snapshot = copy.deepcopy(received)
+
+        coerced = coerce_order_to_sign(received)
+
+        self.assertEqual(expected['message'], coerced['message'])
+        self.assertEqual(expected['domain'], coerced['domain'])
+        self.assertEqual(encode_typed_data(expected), encode_typed_data(coerced))
+        # The caller's payload is not modified
+        self.assertEqual(snapshot, received)
+
+    def test_nested_structs_and_arrays(self):
+        types = {
+            'Leg': [{'name': 'amount', 'type': 'uint256'}, {'name': 'token', 'type': 'address'}],
+            'Empty': [{'name': 'label', 'type': 'string'}],
+            'Bundle': [
+                {'name': 'legs', 'type': 'Leg[]'},
+                {'name': 'main', 'type': 'Leg'},
+                {'name': 'nonces', 'type': 'uint256[2]'},
+                {'name': 'note', 'type': 'Empty'},
+                {'name': 'amount', 'type': 'string'},
+            ],
+        }
+        message = {
+            'legs': [{'amount': '1', 'token': '0x00'}, {'amount': '2', 'token': '0x01'}],
+            'main': {'amount': '3', 'token': '0x02'},
+            'nonces': ['4', '5'],
+            'note': {'label': '6'},
+            'amount': '7',
+        }
+        snapshot = copy.deepcopy(message)
+
+        coerced = coerce_order_to_sign({'types': types, 'primaryType': 'Bundle', 'message': message})['message']
+
+        self.assertEqual([1, 2], [leg['amount'] for leg in coerced['legs']])
+        self.assertEqual(3, coerced['main']['amount'])
+        self.assertEqual([4, 5], coerced['nonces'])
+        self.assertEqual({'label': '6'}, coerced['note'])
+        self.assertEqual('7', coerced['amount'])
+        self.assertEqual(snapshot, message)
+
+    def test_recursive_struct(self):
+        types = {'Node': [{'name': 'value', 'type': 'uint256'}, {'name': 'children', 'type': 'Node[]'}]}
+        message = {'value': '1', 'children': [{'value': '2', 'children': [{'value': '3', 'children': []}]}]}
+
+        coerced = coerce_order_to_sign({'types': types, 'primaryType': 'Node', 'message': message})['message']
+
+        self.assertEqual(3, coerced['children'][0]['children'][0]['value'])
+        self.assertEqual('1', message['value'])
+
+    def test_plan_is_cached_by_fingerprint(self):
+        order = opium_order(0)
+        self.assertIs(coercion_plan('Order', order['types']), coercion_plan('Order', copy.deepcopy(order['types'])))
@@ -0,0 +1,118 @@
+import json
+import unittest
+
+from decimal import Decimal
+
+import pytest
+
+from libs.py_eth_sig_utils.benchmarks.fixtures import OPIUM_ORDER
+
+from opium_api.connector import Connector
+from opium_api.enums import OrderBookAction
+from opium_api.exceptions import APIException
+from opium_api.models import OrderSpec
+from opium_api.order_tracker import OrderTracker
+from opium_api.tests.conftest import Response
+
+PRIVATE_KEY = '01' * 32
+PUBLIC_KEY = '0x%040x' % 1
+
+
+def spec(price: int) -> OrderSpec:
+    return OrderSpec(OrderBookAction.bid, 'ticker', 'currency', Decimal(price), 1, 2000000000)
+
+
+@pytest.mark.usefixtures('fake_api')
+class TestSendOrders(unittest.TestCase):
+
+    def setUp(self):
+        self.posts = []
+        # Prices whose orders the API rejects, and the status it rejects them with
+        self.rejected = {}
+        # Prices whose orders are accepted but left out of the response
+        self.unlisted = set()
+
+    def fake_call(self, endpoint, arguments=None, data=None, body=None):
+        if endpoint == '/orderbook/formOrder':
+            if data['price'] <= 0:
+                return Response(422, {'message': 'Invalid price'})
+            return Response(200, [{'id': 'order-%d' % data['price'], 'orderToSign': OPIUM_ORDER}])
+        if endpoint == '/orderbook/orders':
+            ids = [order['id'] for order in (json.loads(body) if body is not None else data)]
+            with self.lock:
+                self.posts.append(ids)
+            for price, status in self.rejected.items():
+                if 'order-%d' % price in ids:
+                    return Response(status, {'message': 'Rejected order-%d' % price})
+            return Response(201, [{'id': order_id} for order_id in ids
+                                  if int(order_id.split('-')[1]) not in self.unlisted])
+        return Response(404, {})
+
+    def test_all_created(self):
+        with Connector(PRIVATE_KEY, PUBLIC_KEY) as connector:
+            results = connector.send_orders([spec(price) for price in range(1, 6)], batch_size=2)
+
+        self.assertEqual([['order-%d' % price] for price in range(1, 6)], [result.order_ids for result in results])
+        self.assertTrue(all(result.error is None for result in results))
+        self.assertEqual([['order-1', 'order-2'], ['order-3', 'order-4'], ['order-5']], self.posts)
+
+    def test_rejected_orders_get_their_own_error(self):
+        self.rejected = {3: 422, 6: 409}
+        tracker = OrderTracker()
+        with Connector(PRIVATE_KEY, PUBLIC_KEY, order_tracker=tracker) as connector:
+            results = connector.send_orders([spec(price) for price in range(1, 9)], batch_size=8)
+
+        for price, result in zip(range(1, 9), results):
+            if price in self.rejected:
+                self.assertEqual([], result.order_ids)
+                self.assertIsInstance(result.error, APIException)
+                self.assertIn('%d Rejected order-%d' % (self.rejected[price], price), str(result.error))
+            else:
+                self.assertIsNone(result.error)
+                self.assertEqual(['order-%d' % price], result.order_ids)
+
+        self.assertEqual({'order-1', 'order-2', 'order-4', 'order-5', 'order-7', 'order-8'}, tracker.ids())
+        # The batch of 8 is halved until the rejected orders are alone
+        self.assertEqual(['order-%d' % price for price in range(1, 9)], self.posts[0])
+        self.assertIn(['order-3'], self.posts)
+        self.assertIn(['order-6'], self.posts)
+        self.assertLess(len(self.posts), 8 * 2)
+
+    def test_request_errors_are_not_split(self):
+        self.rejected = {2: 500}
+        with Connector(PRIVATE_KEY, PUBLIC_KEY) as connector:
+            results = connector.send_orders([spec(price) for price in range(1, 5)], batch_size=4)
+
+        self.assertEqual(1, len(self.posts))
+        self.assertTrue(all(isinstance(result.error, APIException) and not result.order_ids for result in results))
+
+    def test_response_ids_are_mapped_to_specs(self):
+        self.unlisted = {2}
+        with Connector(PRIVATE_KEY, PUBLIC_KEY) as connector:
+            results = connector.send_orders([spec(price) for price in range(1, 4)])
+
+        self.assertEqual([['order-1'], [], ['order-3']], [result.order_ids for result in results])
+        self.assertIsNone(results[0].error)
+        self.assertIsInstance(results[1].error, APIException)
+        self.assertIn('order-2', str(results[1].error))
+
+    def test_rejected_form_order(self):
+        with Connector(PRIVATE_KEY, PUBLIC_KEY) as connector:
+            results = connector.send_orders([spec(1), spec(0), spec(2)])
+            ladder = connector.prepare_ladder('ticker', 'currency', OrderBookAction.bid, [Decimal(0), Decimal(3)],
+                                              quantity=1, expires_at=2000000000)
+            with self.assertRaises(APIException):
+                connector.send_order(OrderBookAction.bid, 'ticker', 'currency', Decimal(0), 1, 2000000000)
+
+        self.assertEqual([['order-1'], [], ['order-2']], [result.order_ids for result in results])
+        self.assertIsInstance(results[1].error, APIException)
+        self.assertIn('422 Invalid price', str(results[1].error))
+        self.assertEqual([['order-1', 'order-2']], self.posts)
+
+        self.assertIsInstance(ladder[0].error, APIException)
+        self.assertEqual(['order-3'], ladder[1].order_ids)
+        self.assertIsNone(ladder[1].error)
+
+
+if __name__ == '__main__':
+    unittest.main()
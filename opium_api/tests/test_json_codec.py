@@ -0,0 +1,40 @@
+import unittest
+
+import pytest
+
+from opium_api import json_codec
+from opium_api.connector import Connector
+from opium_api.tests.conftest import Response
+
+TOKEN_ID = 81290913431932358962617498384342373566151542098779622385085722364318931372817
+
+
+class TestJsonCodec(unittest.TestCase):
+
+    def test_uint256_survives_loads(self):
+        body = b'[{"id": "1", "makerTokenId": %d, "nested": {"values": [1, %d]}}]' % (TOKEN_ID, 2 ** 64)
+        order = json_codec.loads(body)[0]
+        self.assertEqual(TOKEN_ID, order['makerTokenId'])
+        self.assertEqual([1, 2 ** 64], order['nested']['values'])
+
+    def test_dumps_round_trip(self):
+        data = [{'id': 'a', 'price': 1.5, 'quantity': 2 ** 63 - 1, 'tokenId': TOKEN_ID, 'ticker': str(TOKEN_ID)}]
+        for fast in (True, False):
+            with self.subTest(fast=fast):
+                self.assertEqual(data, json_codec.loads(json_codec.dumps(data, fast=fast)))
+                self.assertEqual(data, json_codec.loads(json_codec.join_items([json_codec.dumps_items(data, fast=fast)])))
+
+
+@pytest.mark.usefixtures('fake_api')
+class TestConnectorParsing(unittest.TestCase):
+
+    def fake_call(self, endpoint, arguments=None, data=None, body=None):
+        return Response(200, [{'tokenId': TOKEN_ID, 'balance': str(TOKEN_ID)}])
+
+    def test_connector_keeps_uint256(self):
+        with Connector('01' * 32, '0x%040x' % 1) as connector:
+            self.assertEqual([{'tokenId': TOKEN_ID, 'balance': str(TOKEN_ID)}], connector.get_balance())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,261 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from decimal import Decimal
+from unittest import mock
+
+import requests
+
+from libs.py_eth_sig_utils import utils
+from libs.py_eth_sig_utils.instrumentation import HistogramInstrument
+from libs.py_eth_sig_utils.signing import Signer
+
+from opium_api.async_connector import AsyncConnector
+from opium_api.connector import Connector
+from opium_api.enums import OrderBookAction, CancelStatus
+from opium_api.exceptions import PreparedOrderMissingException
+from opium_api.load_test import run_load
+from opium_api.local_server import LocalApiServer
+from opium_api.models import OrderSpec
+from opium_api.order_tracker import OrderTracker
+from opium_api.rate_limiter import RateLimiter
+from opium_api import json_codec
+
+PRIVATE_KEY = utils.sha3('cow').hex()
+PUBLIC_KEY = utils.checksum_encode(utils.privtoaddr(utils.sha3('cow')))
+TICKER_HASH = '0x' + '5a' * 32
+CURRENCY_HASH = '0x' + 'c3' * 32
+
+
+def spec(price: str) -> OrderSpec:
+    return OrderSpec(OrderBookAction.bid, TICKER_HASH, CURRENCY_HASH, Decimal(price), 1, int(time.time()) + 600)
+
+
+class TestLocalApiServer(unittest.TestCase):
+
+    def test_connector_round_trip(self):
+        with LocalApiServer(verify_signatures=True) as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url) as connector:
+            self.assertEqual('DAI', connector.get_balance()[0]['symbol'])
+
+            order = spec('1.5')
+            created = connector.send_order(action=order.action,
+                                           ticker_hash=order.ticker_hash,
+                                           currency_hash=order.currency_hash,
+                                           price=order.price,
+                                           quantity=order.quantity,
+                                           expires_at=order.expires_at)
+            self.assertEqual(1, len(created))
+
+            results = connector.send_orders([spec('1'), spec('2'), spec('3')], batch_size=2)
+            self.assertTrue(all(result.error is None and len(result.order_ids) == 1 for result in results))
+            self.assertEqual(4, server.stats['open_orders'])
+
+            connector.cancel_order([created[0]['id']])
+            statuses = connector.cancel_order_async([results[0].order_ids[0], 'unknown']).result()
+            self.assertEqual({results[0].order_ids[0]: CancelStatus.canceled, 'unknown': CancelStatus.not_found},
+                             statuses)
+            self.assertEqual(2, server.stats['open_orders'])
+
+    def test_cancel_keeps_tracked_orders_on_not_found(self):
+        tracker = OrderTracker()
+        with LocalApiServer() as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url, order_tracker=tracker) as connector:
+            live_id = connector.send_orders([spec('1')])[0].order_ids[0]
+            self.assertEqual({live_id}, tracker.ids())
+
+            # All or nothing, the unknown id makes the server cancel nothing
+            connector.cancel_order([live_id, 'unknown'])
+            self.assertEqual(1, server.stats['open_orders'])
+            self.assertEqual({live_id}, tracker.ids())
+
+            connector.cancel_order([live_id])
+            self.assertEqual(0, server.stats['open_orders'])
+            self.assertEqual(set(), tracker.ids())
+
+    def test_duplicate_order_ids(self):
+        with LocalApiServer() as server:
+            params = {'authAddress': PUBLIC_KEY}
+            headers = {'Authorization': 'Bearer 0x00'}
+            ret = requests.post(f'{server.url}/orderbook/formOrder', params=params, headers=headers,
+                                json={'action': 'BID', 'price': 1, 'quantity': 1, 'ticker': TICKER_HASH,
+                                      'currency': CURRENCY_HASH, 'expiresAt': int(time.time()) + 600})
+            signed_order = {'id': ret.json()[0]['id'], 'signature': '0x00'}
+
+            ret = requests.post(f'{server.url}/orderbook/orders', params=params, headers=headers,
+                                json=[signed_order, signed_order])
+            self.assertEqual(422, ret.status_code)
+            self.assertEqual(0, server.stats['orders_created'])
+
+            ret = requests.post(f'{server.url}/orderbook/orders', params=params, headers=headers,
+                                json=[signed_order])
+            self.assertEqual(201, ret.status_code)
+            self.assertEqual(1, server.stats['open_orders'])
+
+    def test_rejects_foreign_signatures(self):
+        other_key = utils.sha3('dog').hex()
+        with LocalApiServer(verify_signatures=True) as server, \
+                Connector(other_key, PUBLIC_KEY, api_url=server.url) as connector:
+            results = connector.send_orders([spec('1')])
+            self.assertIsNotNone(results[0].error)
+            self.assertEqual(0, server.stats['orders_created'])
+
+    def test_rate_limit_injection(self):
+        with LocalApiServer(rate_limit_probability=0.5, retry_after=0, seed=7) as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url,
+                          rate_limiter=RateLimiter(max_retries=30)) as connector:
+            results = connector.send_orders([spec(str(price)) for price in range(1, 6)], batch_size=1)
+
+            self.assertTrue(all(result.error is None for result in results))
+            self.assertGreater(server.stats['rate_limited'], 0)
+            self.assertEqual(server.stats['rate_limited'], connector._Connector__rate_limiter.stats.rejected)
+
+    def test_latency_and_status_codes(self):
+        with LocalApiServer(latency=0.05) as server:
+            start = time.perf_counter()
+            login_data = requests.get(f'{server.url}/auth/loginData').json()
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+            self.assertEqual('LoginData', login_data['primaryType'])
+
+            self.assertEqual(401, requests.get(f'{server.url}/wallet/balance/tokens').status_code)
+            headers = {'Authorization': 'Bearer 0x00'}
+            ret = requests.post(f'{server.url}/orderbook/formOrder', params={'authAddress': PUBLIC_KEY},
+                                headers=headers, json={'action': 'BID', 'price': -1, 'quantity': 1,
+                                                       'ticker': TICKER_HASH, 'currency': CURRENCY_HASH,
+                                                       'expiresAt': 0})
+            self.assertEqual(422, ret.status_code)
+
+    def test_async_connector(self):
+        async def scenario(url):
+            async with AsyncConnector(PRIVATE_KEY, PUBLIC_KEY, api_url=url) as connector:
+                balance = await connector.get_balance()
+                created = await connector.send_order(action=OrderBookAction.ask,
+                                                     ticker_hash=TICKER_HASH,
+                                                     currency_hash=CURRENCY_HASH,
+                                                     price=Decimal('2.5'),
+                                                     quantity=3,
+                                                     expires_at=int(time.time()) + 600)
+                statuses = await connector.cancel_order([created[0]['id'], 'unknown'])
+                return balance, created, statuses
+
+        with LocalApiServer(verify_signatures=True) as server:
+            balance, created, statuses = asyncio.run(scenario(server.url))
+            self.assertEqual('DAI', balance[0]['symbol'])
+            self.assertEqual(1, len(created))
+            self.assertEqual({created[0]['id']: CancelStatus.canceled, 'unknown': CancelStatus.not_found}, statuses)
+            self.assertEqual(1, server.stats['orders_canceled'])
+
+    def test_async_connector_concurrency(self):
+        async def scenario(url):
+            async with AsyncConnector(PRIVATE_KEY, PUBLIC_KEY, api_url=url) as connector:
+                await connector.get_balance()
+                start = time.perf_counter()
+                balances = await asyncio.gather(*[connector.get_balance() for _ in range(100)])
+                return balances, time.perf_counter() - start
+
+        with LocalApiServer(latency=0.1) as server:
+            balances, elapsed = asyncio.run(scenario(server.url))
+
+        self.assertEqual(100, len(balances))
+        # All calls are in flight at once, a per host cap of 10 would take over a second
+        self.assertLess(elapsed, 0.5)
+
+    def test_async_connector_signs_off_the_loop(self):
+        async def scenario(url):
+            async with AsyncConnector(PRIVATE_KEY, PUBLIC_KEY, api_url=url) as connector:
+                loop_thread = threading.get_ident()
+                with mock.patch.object(Signer, 'sign_typed_data', autospec=True,
+                                       side_effect=lambda signer, msg: (signing_threads.append(threading.get_ident())
+                                                                        or sign_typed_data(signer, msg))):
+                    await connector.send_order(action=OrderBookAction.bid,
+                                               ticker_hash=TICKER_HASH,
+                                               currency_hash=CURRENCY_HASH,
+                                               price=Decimal('1'),
+                                               quantity=1,
+                                               expires_at=int(time.time()) + 600)
+                return loop_thread
+
+        signing_threads = []
+        sign_typed_data = Signer.sign_typed_data
+        with LocalApiServer(verify_signatures=True) as server:
+            loop_thread = asyncio.run(scenario(server.url))
+            self.assertEqual(1, server.stats['orders_created'])
+
+        # Access token and order signature
+        self.assertEqual(2, len(signing_threads))
+        self.assertNotIn(loop_thread, signing_threads)
+
+    def test_instrument_sees_every_stage(self):
+        instrument = HistogramInstrument()
+        with LocalApiServer() as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url, instrument=instrument) as connector:
+            connector.send_orders([spec('1'), spec('2')])
+
+        snapshot = instrument.snapshot()
+        self.assertEqual({'request', 'coerce', 'sign', 'eip712', 'ecdsa'}, set(snapshot))
+        # The access token and two orders
+        self.assertEqual(3, snapshot['ecdsa']['count'])
+
+    def test_prepared_ladder(self):
+        now = time.time()
+        prices = [Decimal(price) for price in ('1', '2', '3', '4')]
+        with LocalApiServer(verify_signatures=True) as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url) as connector:
+            ladder = connector.prepare_ladder(TICKER_HASH, CURRENCY_HASH, OrderBookAction.bid, prices,
+                                              quantity=1, expires_at=int(now) + 600)
+            short_lived = connector.prepare_ladder(TICKER_HASH, CURRENCY_HASH, OrderBookAction.bid, [Decimal('5')],
+                                                   quantity=1, expires_at=int(now) + 30)
+            self.assertTrue(all(result.error is None and len(result.order_ids) == 1
+                                for result in ladder + short_lived))
+            before = server.stats
+
+            never_prepared = ladder[0].spec._replace(price=Decimal('9'))
+            specs = [ladder[1].spec, never_prepared, ladder[3].spec, short_lived[0].spec]
+            # The short lived orders are inside the expiry margin by now
+            with mock.patch('opium_api.prepared_orders.time') as clock, \
+                    mock.patch.object(json_codec, 'dumps', wraps=json_codec.dumps) as dumps:
+                clock.time.return_value = now + 100
+                results = connector.submit_prepared(specs)
+                again = connector.submit_prepared([ladder[1].spec])
+
+            after = server.stats
+
+        # One POST /orderbook/orders with the bodies serialized by prepare_ladder, no formOrder
+        self.assertEqual(1, after['requests'] - before['requests'])
+        self.assertEqual(before['orders_formed'], after['orders_formed'])
+        self.assertEqual(2, after['orders_created'])
+        dumps.assert_not_called()
+
+        self.assertEqual(ladder[1].order_ids, results[0].order_ids)
+        self.assertEqual(ladder[3].order_ids, results[2].order_ids)
+        self.assertIsNone(results[0].error)
+        self.assertIsNone(results[2].error)
+        for result in (results[1], results[3], again[0]):
+            self.assertEqual([], result.order_ids)
+            self.assertIsInstance(result.error, PreparedOrderMissingException)
+
+    def test_load_driver(self):
+        with LocalApiServer() as server:
+            report = run_load(server.url, orders=20, concurrency=4, batch_size=5)
+
+        self.assertEqual(20, report['created'])
+        self.assertGreater(report['orders_per_second'], 0)
+        self.assertEqual(4, report['latency']['count'])
+        self.assertIn('sign', report['stages'])
+
+    def test_load_driver_counts_failures(self):
+        for batch_size in (0, 5):
+            with self.subTest(batch_size=batch_size), \
+                    LocalApiServer(rate_limit_probability=0.4, retry_after=0, seed=3) as server:
+                report = run_load(server.url, orders=40, concurrency=4, batch_size=batch_size, max_retries=0)
+                stats = server.stats
+
+            self.assertEqual(stats['orders_created'], report['created'])
+            self.assertGreater(report['failed'], 0)
+            self.assertEqual(40, report['created'] + report['failed'])
+
+
+if __name__ == '__main__':
+    unittest.main()
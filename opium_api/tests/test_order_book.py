@@ -0,0 +1,255 @@
+import asyncio
+import json
+import unittest
+
+from decimal import Decimal
+from unittest import mock
+
+from aiohttp import ClientWebSocketResponse, web
+
+from opium_api.enums import OrderBookAction
+from opium_api.exceptions import SequenceGapException
+from opium_api.order_book import OrderBook
+from opium_api.order_book_stream import OrderBookStream
+
+TICKER = '0x' + 'ab' * 32
+
+
+class TestOrderBook(unittest.TestCase):
+
+    def test_snapshot_and_updates(self):
+        book = OrderBook()
+        book.apply_snapshot(TICKER, 1, bids=[('1.1', 5), ('1.3', 2), ('1.2', 7)], asks=[('1.5', 1), ('1.4', 3)])
+        self.assertEqual((Decimal('1.3'), 2), book.best_bid(TICKER))
+        self.assertEqual((Decimal('1.4'), 3), book.best_ask(TICKER))
+        self.assertEqual([(Decimal('1.3'), 2), (Decimal('1.2'), 7)], book.depth(TICKER, OrderBookAction.bid, 2))
+        self.assertEqual([(Decimal('1.4'), 3), (Decimal('1.5'), 1)], book.depth(TICKER, OrderBookAction.ask, 5))
+
+        book.apply_update(TICKER, 2, [(OrderBookAction.bid, Decimal('1.3'), 0), (OrderBookAction.ask, Decimal('1.35'), 4)])
+        self.assertEqual((Decimal('1.2'), 7), book.best_bid(TICKER))
+        self.assertEqual((Decimal('1.35'), 4), book.best_ask(TICKER))
+
+        # Replayed updates are ignored
+        book.apply_update(TICKER, 2, [(OrderBookAction.bid, Decimal('9'), 1)])
+        self.assertEqual((Decimal('1.2'), 7), book.best_bid(TICKER))
+
+    def test_sequence_gap(self):
+        book = OrderBook()
+        book.apply_snapshot(TICKER, 1, bids=[], asks=[])
+        with self.assertRaises(SequenceGapException):
+            book.apply_update(TICKER, 3, [])
+        self.assertIsNone(book.sequence(TICKER))
+        with self.assertRaises(SequenceGapException):
+            book.apply_update(TICKER, 4, [])
+
+        self.assertIsNone(OrderBook().best_bid(TICKER))
+
+
+class TestOrderBookStream(unittest.TestCase):
+
+    def test_stream_resyncs_on_gap(self):
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            snapshots = 0
+            async for msg in ws:
+                message = json.loads(msg.data)
+                if message['type'] != 'subscribe':
+                    continue
+                snapshots += 1
+                if snapshots == 1:
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': TICKER, 'sequence': 10,
+                                                  'bids': [['1.0', 1]], 'asks': [['2.0', 1]]}))
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': TICKER, 'sequence': 11,
+                                                  'changes': [['BID', '1.5', 3]]}))
+                    # Sequence 12 is lost
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': TICKER, 'sequence': 13,
+                                                  'changes': [['ASK', '1.8', 3]]}))
+                else:
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': TICKER, 'sequence': 20,
+                                                  'bids': [['1.6', 2]], 'asks': [['1.7', 2]]}))
+            return ws
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/stream', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            stream = OrderBookStream(url=f'http://127.0.0.1:{port}/stream')
+            await stream.subscribe(TICKER)
+            task = asyncio.ensure_future(stream.run())
+            for _ in range(100):
+                if stream.book.sequence(TICKER) == 20:
+                    break
+                await asyncio.sleep(0.01)
+            await stream.close()
+            await task
+            await runner.cleanup()
+            return stream
+
+        stream = asyncio.run(scenario())
+        self.assertEqual(1, stream.resyncs)
+        self.assertEqual(20, stream.book.sequence(TICKER))
+        self.assertEqual((Decimal('1.6'), 2), stream.book.best_bid(TICKER))
+        self.assertEqual((Decimal('1.7'), 2), stream.book.best_ask(TICKER))
+
+    def test_stream_resyncs_on_malformed_frame(self):
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            snapshots = 0
+            async for msg in ws:
+                message = json.loads(msg.data)
+                if message['type'] != 'subscribe':
+                    continue
+                snapshots += 1
+                if snapshots == 1:
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': TICKER, 'sequence': 10,
+                                                  'bids': [['1.0', 1]], 'asks': [['2.0', 1]]}))
+                    await ws.send_str('not json')
+                    await ws.send_str(json.dumps(['update']))
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': ['list'], 'sequence': 11}))
+                    # Unknown side, the update can not be applied
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': TICKER, 'sequence': 11,
+                                                  'changes': [['BUY', '1.5', 3]]}))
+                elif snapshots == 2:
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': TICKER, 'sequence': 30,
+                                                  'bids': [['1.6', 2]], 'asks': [['1.7', 2]]}))
+                    # Missing sequence
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': TICKER,
+                                                  'changes': [['ASK', '1.65', 1]]}))
+                else:
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': TICKER, 'sequence': 40,
+                                                  'bids': [['1.6', 2]], 'asks': [['1.7', 2]]}))
+                    await ws.send_str(json.dumps({'type': 'update', 'ticker': TICKER, 'sequence': 41,
+                                                  'changes': [['ASK', '1.65', 1]]}))
+            return ws
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/stream', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            stream = OrderBookStream(url=f'http://127.0.0.1:{port}/stream')
+            await stream.subscribe(TICKER)
+            task = asyncio.ensure_future(stream.run())
+            for _ in range(100):
+                if stream.book.sequence(TICKER) == 41:
+                    break
+                await asyncio.sleep(0.01)
+            await stream.close()
+            await task
+            await runner.cleanup()
+            return stream
+
+        stream = asyncio.run(scenario())
+        self.assertEqual(0, stream.reconnects)
+        self.assertEqual(2, stream.resyncs)
+        self.assertEqual(4, stream.malformed)
+        self.assertEqual(41, stream.book.sequence(TICKER))
+        self.assertEqual((Decimal('1.65'), 1), stream.book.best_ask(TICKER))
+
+    def test_stream_keeps_numeric_prices_exact(self):
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for msg in ws:
+                if json.loads(msg.data)['type'] == 'subscribe':
+                    await ws.send_str('{"type": "snapshot", "ticker": "%s", "sequence": 10, '
+                                      '"bids": [[0.1, 1]], "asks": [[0.3, 1]]}' % TICKER)
+                    await ws.send_str('{"type": "update", "ticker": "%s", "sequence": 11, '
+                                      '"changes": [["ASK", 0.30000000000000004, 2]]}' % TICKER)
+            return ws
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/stream', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            stream = OrderBookStream(url=f'http://127.0.0.1:{port}/stream')
+            await stream.subscribe(TICKER)
+            task = asyncio.ensure_future(stream.run())
+            for _ in range(100):
+                if stream.book.sequence(TICKER) == 11:
+                    break
+                await asyncio.sleep(0.01)
+            await stream.close()
+            await task
+            await runner.cleanup()
+            return stream
+
+        stream = asyncio.run(scenario())
+        self.assertEqual(0, stream.malformed)
+        self.assertEqual((Decimal('0.1'), 1), stream.book.best_bid(TICKER))
+        self.assertEqual([(Decimal('0.3'), 1), (Decimal('0.30000000000000004'), 2)],
+                         stream.book.depth(TICKER, OrderBookAction.ask, 2))
+
+    def test_subscribe_while_resubscribing(self):
+        tickers = ['0x%064x' % index for index in range(20)]
+
+        async def handler(request):
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            async for msg in ws:
+                message = json.loads(msg.data)
+                if message['type'] == 'subscribe':
+                    await ws.send_str(json.dumps({'type': 'snapshot', 'ticker': message['ticker'], 'sequence': 1,
+                                                  'bids': [], 'asks': []}))
+            return ws
+
+        async def scenario():
+            app = web.Application()
+            app.router.add_get('/stream', handler)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = runner.addresses[0][1]
+
+            stream = OrderBookStream(url=f'http://127.0.0.1:{port}/stream')
+            for ticker_hash in tickers[:10]:
+                await stream.subscribe(ticker_hash)
+
+            send_str = ClientWebSocketResponse.send_str
+            resubscribing = asyncio.Event()
+
+            async def slow_send_str(ws, data, compress=None):
+                # Yield on every send so subscribe() runs during the resubscribe
+                resubscribing.set()
+                await asyncio.sleep(0)
+                await send_str(ws, data, compress)
+
+            with mock.patch.object(ClientWebSocketResponse, 'send_str', slow_send_str):
+                task = asyncio.ensure_future(stream.run())
+                await resubscribing.wait()
+                for ticker_hash in tickers[10:]:
+                    await stream.subscribe(ticker_hash)
+                    await asyncio.sleep(0)
+                for _ in range(100):
+                    if all(stream.book.sequence(ticker_hash) == 1 for ticker_hash in tickers):
+                        break
+                    await asyncio.sleep(0.01)
+            await stream.close()
+            await task
+            await runner.cleanup()
+            return stream
+
+        stream = asyncio.run(scenario())
+        self.assertEqual(0, stream.reconnects)
+        self.assertEqual(sorted(tickers), sorted(stream.book.tickers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+
+from decimal import Decimal
+
+from opium_api.enums import OrderBookAction
+from opium_api.models import OrderSpec
+from opium_api.order_tracker import OrderTracker
+
+
+class TestOrderTracker(unittest.TestCase):
+
+    def test_indexes(self):
+        tracker = OrderTracker()
+        tracker.add('1', OrderSpec(OrderBookAction.bid, 'tx', 'usdc', Decimal('1.1'), 1, 100))
+        tracker.add('2', OrderSpec(OrderBookAction.bid, 'tx', 'dai', Decimal('1.2'), 1, 200))
+        tracker.add('3', OrderSpec(OrderBookAction.ask, 'tx', 'usdc', Decimal('1.3'), 1, 300))
+        tracker.add_many(['4', '5'], OrderSpec(OrderBookAction.bid, 'ty', 'usdc', Decimal('1.4'), 1, 400))
+
+        self.assertEqual(5, len(tracker))
+        self.assertEqual({'1', '2'}, tracker.ids(ticker_hash='tx', action=OrderBookAction.bid))
+        self.assertEqual({'1', '2', '3'}, tracker.ids(ticker_hash='tx'))
+        self.assertEqual({'1'}, tracker.ids(ticker_hash='tx', action=OrderBookAction.bid, currency_hash='usdc'))
+        self.assertEqual({'1', '3', '4', '5'}, tracker.ids(currency_hash='usdc'))
+        self.assertEqual({'3'}, {order.id for order in tracker.orders(action=OrderBookAction.ask)})
+
+        self.assertEqual(['2'], [order.id for order in tracker.remove(['2', 'missing'])])
+        self.assertEqual({'1'}, tracker.ids(ticker_hash='tx', action=OrderBookAction.bid))
+
+        tracker.on_event('4', 'PARTIALLY_FILLED', remaining_quantity=1)
+        tracker.on_event('5', 'FILLED')
+        self.assertEqual({'4'}, tracker.ids(ticker_hash='ty'))
+
+        self.assertEqual(['1', '3'], [order.id for order in tracker.remove_expired(now=300)])
+        self.assertEqual({'4'}, tracker.ids())
+        self.assertEqual(set(), tracker.ids(ticker_hash='tx'))
+
+    def test_readd_keeps_latest_expiry(self):
+        tracker = OrderTracker()
+        tracker.add('1', OrderSpec(OrderBookAction.bid, 'tx', 'usdc', Decimal('1'), 1, 100))
+        tracker.add('1', OrderSpec(OrderBookAction.ask, 'tx', 'usdc', Decimal('1'), 1, 500))
+        self.assertEqual([], tracker.remove_expired(now=200))
+        self.assertEqual(set(), tracker.ids(action=OrderBookAction.bid))
+        self.assertEqual({'1'}, tracker.ids(action=OrderBookAction.ask))
+
+    def test_events(self):
+        tracker = OrderTracker()
+        tracker.add_many(['1', '2', '3', '4', '5'], OrderSpec(OrderBookAction.bid, 'tx', 'usdc', Decimal('1'), 5, 100))
+
+        tracker.on_event('1', 'OPEN')
+        tracker.on_event('2', 'PARTIALLY_FILLED')
+        tracker.on_event('3', 'PARTIALLY_FILLED', remaining_quantity=2)
+        tracker.on_event('4', 'SOMETHING_NEW', remaining_quantity=1)
+        self.assertEqual({'1', '2', '3', '4', '5'}, tracker.ids())
+        self.assertEqual(5, tracker.get('2').quantity)
+        self.assertEqual(2, tracker.get('3').quantity)
+        self.assertEqual(5, tracker.get('4').quantity)
+
+        tracker.on_event('1', 'FILLED')
+        tracker.on_event('2', 'CANCELED')
+        tracker.on_event('3', 'EXPIRED')
+        tracker.on_event('missing', 'FILLED')
+        self.assertEqual({'4', '5'}, tracker.ids())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import time
+import unittest
+
+from decimal import Decimal
+
+from opium_api.enums import OrderBookAction
+from opium_api.models import OrderSpec
+from opium_api.prepared_orders import PreparedOrderCache
+
+
+class TestPreparedOrderCache(unittest.TestCase):
+
+    def spec(self, price, expires_at):
+        return OrderSpec(OrderBookAction.ask, 'ticker', 'currency', Decimal(price), 1, expires_at)
+
+    def test_take_once(self):
+        cache = PreparedOrderCache(expiry_margin=5)
+        spec = self.spec('1.5', int(time.time()) + 60)
+        self.assertTrue(cache.put(spec, [{'id': '1', 'signature': '0x00'}]))
+        self.assertEqual(1, len(cache))
+        self.assertEqual([{'id': '1', 'signature': '0x00'}], cache.take(self.spec('1.50', spec.expires_at)).signed_orders)
+        self.assertIsNone(cache.take(spec))
+
+    def test_evicts_before_expiry(self):
+        cache = PreparedOrderCache(expiry_margin=5)
+        self.assertFalse(cache.put(self.spec('1', int(time.time()) + 4), []))
+
+        spec = self.spec('2', int(time.time()) + 6)
+        self.assertTrue(cache.put(spec, []))
+        time.sleep(1.1)
+        self.assertIsNone(cache.take(spec))
+        self.assertEqual(0, len(cache))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import time
+import unittest
+
+from email.utils import formatdate
+from unittest import mock
+
+from opium_api.rate_limiter import RateLimiter, TokenBucket
+
+
+class Clock:
+    def __init__(self, now: float = 100.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_refill_and_reservations(self):
+        clock = Clock()
+        bucket = TokenBucket(rate=2, capacity=3, clock=clock)
+
+        # The burst is served right away, then callers queue behind each other
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertEqual(0.5, bucket.reserve())
+        self.assertEqual(1.0, bucket.reserve())
+
+        # Refilled tokens pay off the reservations first
+        clock.now += 1
+        self.assertEqual(0.5, bucket.reserve())
+
+        # Idle time never stores more than capacity
+        clock.now += 60
+        self.assertEqual([0, 0, 0], [bucket.reserve() for _ in range(3)])
+        self.assertEqual(0.5, bucket.reserve())
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0, capacity=1)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=0.5)
+
+
+class TestRateLimiter(unittest.TestCase):
+
+    def test_opt_in(self):
+        limiter = RateLimiter(limits={'orderbook': (1, 1)})
+        with mock.patch('opium_api.rate_limiter.time.sleep') as sleep:
+            for _ in range(5):
+                limiter.acquire('/wallet/balance/tokens')
+            sleep.assert_not_called()
+
+            limiter.acquire('/orderbook/formOrder')
+            limiter.acquire('/orderbook/orders')
+            self.assertEqual(1, sleep.call_count)
+        self.assertEqual(1, limiter.stats.throttled)
+
+    def test_retry_after_is_capped(self):
+        limiter = RateLimiter(backoff_base=0.25, backoff_cap=10)
+
+        self.assertEqual(3, limiter.backoff(0, '3'))
+        self.assertEqual(10, limiter.backoff(0, '86400'))
+        self.assertEqual(0, limiter.backoff(0, '-5'))
+        self.assertEqual(10, limiter.backoff(0, formatdate(time.time() + 3600, usegmt=True)))
+        self.assertLessEqual(limiter.backoff(0, 'inf'), 10)
+
+        # Unparsable values fall back to the jittered exponential backoff
+        for attempt, retry_after in enumerate(('soon', 'nan', None, '')):
+            self.assertLessEqual(limiter.backoff(attempt, retry_after), min(10, 0.25 * 2 ** attempt))
+
+        self.assertEqual({'throttled': 0, 'rejected': 9, 'retried': 9}, limiter.stats.as_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import copy
+import unittest
+
+from libs.py_eth_sig_utils import utils
+from libs.py_eth_sig_utils.benchmarks.fixtures import OPIUM_ORDER
+from libs.py_eth_sig_utils.signing import Signer, v_r_s_to_signature
+
+from opium_api.coercion import coerce_order_to_sign
+from opium_api.enums import SigningMode
+from opium_api.signing_executor import SigningExecutor
+
+
+def messages(count: int):
+    for nonce in range(count):
+        order = copy.deepcopy(OPIUM_ORDER)
+        order['message']['nonce'] = str(nonce)
+        yield coerce_order_to_sign(order)
+
+
+class TestSigningExecutor(unittest.TestCase):
+
+    def test_modes_agree(self):
+        signer = Signer(utils.sha3('cow'))
+        batch = list(messages(37))
+        expected = [v_r_s_to_signature(*signer.sign_typed_data(message)).hex() for message in batch]
+        self.assertEqual(len(batch), len(set(expected)))
+
+        for mode in SigningMode:
+            with self.subTest(mode=mode), SigningExecutor(mode=mode, workers=2, chunk_size=8) as executor:
+                self.assertEqual(expected, executor.sign(signer, batch))
+                # Small batches are signed inline
+                self.assertEqual(expected[:8], executor.sign(signer, batch[:8]))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            SigningExecutor(workers=0)
+        with self.assertRaises(ValueError):
+            SigningExecutor(chunk_size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from libs.py_eth_sig_utils import utils
+
+from opium_api.async_connector import AsyncConnector
+from opium_api.connector import Connector
+from opium_api.local_server import LocalApiServer
+from opium_api.token_manager import TokenManager
+
+PRIVATE_KEY = utils.sha3('cow').hex()
+PUBLIC_KEY = utils.checksum_encode(utils.privtoaddr(utils.sha3('cow')))
+STALE_TOKEN = '00' * 65
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestTokenManager(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.generated = []
+
+    def generate(self) -> str:
+        token = 'token%d' % len(self.generated)
+        self.generated.append(token)
+        return token
+
+    def cache_path(self) -> str:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, 'tokens.json')
+
+    def test_refresh_margin(self):
+        manager = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, clock=self.clock)
+
+        self.assertEqual('token0', manager.get())
+        self.assertEqual(1100, manager.expires_at)
+
+        self.clock.now = 1089
+        self.assertEqual('token0', manager.get())
+        # Inside the refresh margin the token counts as expired
+        self.clock.now = 1090
+        self.assertEqual('', manager.current())
+        self.assertEqual('token1', manager.get())
+        self.assertEqual(1190, manager.expires_at)
+
+    def test_invalidate(self):
+        manager = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, clock=self.clock)
+        manager.get()
+
+        # A token that was already replaced is left alone
+        manager.invalidate('older')
+        self.assertEqual('token0', manager.get())
+
+        manager.invalidate('token0')
+        self.assertEqual('', manager.current())
+        self.assertEqual('token1', manager.get())
+
+    def test_update_without_generate(self):
+        manager = TokenManager(ttl=100, refresh_margin=10, clock=self.clock)
+        with self.assertRaises(RuntimeError):
+            manager.get()
+        with self.assertRaises(ValueError):
+            TokenManager(background_refresh=True)
+
+        self.assertEqual('signed', manager.update('signed'))
+        self.assertEqual('signed', manager.current())
+        self.clock.now = 1095
+        self.assertEqual('', manager.current())
+
+    def test_background_refresh(self):
+        refreshed = threading.Event()
+
+        def generate():
+            token = self.generate()
+            if len(self.generated) == 2:
+                refreshed.set()
+            return token
+
+        # The timer fires ttl - refresh_margin = 0.05s after the first token
+        manager = TokenManager(generate=generate, ttl=0.15, refresh_margin=0.1, clock=self.clock,
+                               background_refresh=True)
+        try:
+            self.assertEqual('token0', manager.get())
+            self.assertTrue(refreshed.wait(5))
+            self.assertNotEqual('token0', manager.get())
+        finally:
+            manager.close()
+
+        # No refresh after close
+        generated = len(self.generated)
+        time.sleep(0.2)
+        self.assertEqual(generated, len(self.generated))
+
+    def test_shared_cache(self):
+        cache_path = self.cache_path()
+        first = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, cache_path=cache_path,
+                             cache_key='a', clock=self.clock)
+        second = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, cache_path=cache_path,
+                              cache_key='a', clock=self.clock)
+        other = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, cache_path=cache_path,
+                             cache_key='b', clock=self.clock)
+
+        self.assertEqual('token0', first.get())
+        self.assertEqual('token0', second.get())
+        self.assertEqual(1100, second.expires_at)
+        self.assertEqual('token1', other.get())
+        self.assertEqual(['token0', 'token1'], self.generated)
+
+        # The rejected token is dropped from the file as well
+        first.invalidate('token0')
+        third = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, cache_path=cache_path,
+                             cache_key='a', clock=self.clock)
+        self.assertEqual('token2', third.get())
+
+    def test_malformed_cache_entries(self):
+        cache_path = self.cache_path()
+        entries = [{'token': 'cached'},
+                   {'token': 'cached', 'expires_at': 'soon'},
+                   {'token': 'cached', 'expires_at': None},
+                   {'token': None, 'expires_at': 2000},
+                   ['cached', 2000],
+                   'cached']
+        for entry in entries:
+            with open(cache_path, 'w') as f:
+                json.dump({'a': entry}, f)
+
+            manager = TokenManager(generate=self.generate, ttl=100, refresh_margin=10, cache_path=cache_path,
+                                   cache_key='a', clock=self.clock)
+            self.assertNotEqual('cached', manager.get())
+
+        self.assertEqual(6, len(self.generated))
+
+
+class TestUnauthorizedRetry(unittest.TestCase):
+
+    def test_connector(self):
+        with LocalApiServer(verify_signatures=True) as server, \
+                Connector(PRIVATE_KEY, PUBLIC_KEY, api_url=server.url) as connector:
+            token_manager = connector._Connector__token_manager
+            token_manager.update(STALE_TOKEN)
+
+            self.assertEqual('DAI', connector.get_balance()[0]['symbol'])
+            self.assertNotEqual(STALE_TOKEN, token_manager.current())
+            # The 401, the login for a new token and the retry
+            self.assertEqual(3, server.stats['requests'])
+
+    def test_async_connector(self):
+        async def scenario(url):
+            async with AsyncConnector(PRIVATE_KEY, PUBLIC_KEY, api_url=url) as connector:
+                token_manager = connector._AsyncConnector__token_manager
+                token_manager.update(STALE_TOKEN)
+
+                balances = await asyncio.gather(connector.get_balance(), connector.get_balance())
+                return balances, token_manager.current()
+
+        with LocalApiServer(verify_signatures=True) as server:
+            balances, access_token = asyncio.run(scenario(server.url))
+            # Two 401s, one shared login and two retries
+            self.assertEqual(5, server.stats['requests'])
+
+        self.assertEqual(['DAI', 'DAI'], [balance[0]['symbol'] for balance in balances])
+        self.assertNotEqual(STALE_TOKEN, access_token)
+
+
+if __name__ == '__main__':
+    unittest.main()
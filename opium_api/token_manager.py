@@ -0,0 +1,193 @@
+import json
+import os
+import tempfile
+import time
+
+from threading import Lock, Timer
+from typing import Callable, Optional
+
+from opium_api.constants import ACCESS_TOKEN_TTL, ACCESS_TOKEN_REFRESH_MARGIN, ACCESS_TOKEN_RETRY_DELAY
+
+
+class TokenManager:
+    """
+    Access token lifetime: expiry with a refresh margin, an optional file cache
+    shared between processes and an optional background refresh
+
+    Without ``generate`` tokens are produced by the caller and handed over with
+    update(), which is how AsyncConnector signs them on its own event loop.
+    """
+
+    def __init__(self,
+                 generate: Optional[Callable[[], str]] = None,
+                 ttl: float = ACCESS_TOKEN_TTL,
+                 refresh_margin: float = ACCESS_TOKEN_REFRESH_MARGIN,
+                 cache_path: Optional[str] = None,
+                 cache_key: str = '',
+                 background_refresh: bool = False,
+                 clock: Callable[[], float] = time.time):
+        if refresh_margin >= ttl:
+            raise ValueError('"refresh_margin" must be less than "ttl"')
+        if background_refresh and generate is None:
+            raise ValueError('"background_refresh" needs "generate"')
+
+        self.__generate: Optional[Callable[[], str]] = generate
+        self.__ttl: float = ttl
+        self.__refresh_margin: float = refresh_margin
+        self.__cache_path: Optional[str] = cache_path
+        self.__cache_key: str = cache_key
+        self.__background_refresh: bool = background_refresh
+        self.__clock: Callable[[], float] = clock
+
+        self.__token: str = ''
+        self.__expires_at: float = 0
+        self.__lock: Lock = Lock()
+        self.__timer: Optional[Timer] = None
+        self.__closed: bool = False
+
+    @property
+    def expires_at(self) -> float:
+        return self.__expires_at
+
+    def __is_fresh(self, expires_at: float) -> bool:
+        return self.__clock() < expires_at - self.__refresh_margin
+
+    def __load_cache(self) -> bool:
+        if not self.__cache_path:
+            return False
+
+        try:
+            with open(self.__cache_path) as f:
+                entry = json.load(f)[self.__cache_key]
+            token = entry['token']
+            expires_at = float(entry['expires_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+        if not token or not isinstance(token, str) or not self.__is_fresh(expires_at):
+            return False
+
+        self.__token = token
+        self.__expires_at = expires_at
+        return True
+
+    def __store_cache(self):
+        if not self.__cache_path:
+            return
+
+        try:
+            with open(self.__cache_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = {}
+
+        entries[self.__cache_key] = {'token': self.__token, 'expires_at': self.__expires_at}
+
+        # Write to a temporary file first so other processes never read a partial cache
+        directory = os.path.dirname(os.path.abspath(self.__cache_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.__cache_path)
+        except OSError:
+            os.unlink(tmp_path)
+
+    def __schedule(self, delay: float):
+        if not self.__background_refresh or self.__closed:
+            return
+
+        if self.__timer is not None:
+            self.__timer.cancel()
+
+        self.__timer = Timer(max(delay, 0), self.__background_refresh_token)
+        self.__timer.daemon = True
+        self.__timer.start()
+
+    def __background_refresh_token(self):
+        try:
+            self.refresh()
+        except Exception:
+            # Keep the current token and try again shortly
+            with self.__lock:
+                self.__schedule(ACCESS_TOKEN_RETRY_DELAY)
+
+    def __set_locked(self, token: str):
+        self.__token = token
+        self.__expires_at = self.__clock() + self.__ttl
+        self.__store_cache()
+        self.__schedule(self.__expires_at - self.__refresh_margin - self.__clock())
+
+    def __refresh_locked(self):
+        if self.__generate is None:
+            raise RuntimeError('TokenManager has no "generate", use update()')
+        self.__set_locked(self.__generate())
+
+    def __current_locked(self) -> str:
+        if self.__token and self.__is_fresh(self.__expires_at):
+            return self.__token
+
+        if self.__load_cache():
+            self.__schedule(self.__expires_at - self.__refresh_margin - self.__clock())
+            return self.__token
+
+        return ''
+
+    def current(self) -> str:
+        """
+        Return the token if it is not about to expire, from memory or the cache file, '' otherwise
+        """
+        token = self.__token
+        if token and self.__is_fresh(self.__expires_at):
+            return token
+
+        with self.__lock:
+            return self.__current_locked()
+
+    def get(self) -> str:
+        """
+        Return a valid token, generating one if the current token is missing or about to expire
+        """
+        token = self.__token
+        if token and self.__is_fresh(self.__expires_at):
+            return token
+
+        with self.__lock:
+            if not self.__current_locked():
+                self.__refresh_locked()
+
+            return self.__token
+
+    def refresh(self) -> str:
+        with self.__lock:
+            self.__refresh_locked()
+            return self.__token
+
+    def update(self, token: str) -> str:
+        """
+        Store a token generated by the caller, it expires ``ttl`` seconds from now
+        """
+        with self.__lock:
+            self.__set_locked(token)
+            return token
+
+    def invalidate(self, token: str):
+        """
+        Drop ``token`` after the API rejected it, unless it was already replaced
+        """
+        with self.__lock:
+            if self.__token == token:
+                self.__token = ''
+                self.__expires_at = 0
+
+                # The cached copy is just as stale
+                if self.__cache_path:
+                    self.__store_cache()
+
+    def close(self):
+        with self.__lock:
+            self.__closed = True
+            if self.__timer is not None:
+                self.__timer.cancel()
+                self.__timer = None